@@ -1,7 +1,9 @@
 import asyncio
 import streamlit as st
+from uuid import uuid4
 
-from main import initialize_backend, process_message
+from main import initialize_backend, stream_message
+from src.modules.const.enum import StreamEventEnum
 
 
 st.set_page_config(page_title="Fraud Detection Agent", layout="wide")
@@ -17,10 +19,32 @@ def init_backend():
     return db, graph, loop
 
 
+def iter_stream(message: str):
+    """Drive the async answer stream on the backend event loop, one event at a time.
+
+    Args:
+        message (str): The user message.
+
+    Yields:
+        StreamEvent: The events of `stream_message`.
+    """
+    stream = stream_message(graph, message, st.session_state.thread_id)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(stream))
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+
+
 db, graph, loop = init_backend()
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+    # one checkpointed thread per browser session, so follow-up questions keep their context
+    st.session_state.thread_id = str(uuid4())
 
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -32,10 +56,23 @@ if prompt := st.chat_input("Enter your question:", key="chat_input"):
         st.write(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("Processing..."):
-            try:
-                response = loop.run_until_complete(process_message(graph, prompt))
-                st.write(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
\ No newline at end of file
+        status = st.status("Processing...")
+        placeholder = st.empty()
+        response = ""
+        try:
+            for event in iter_stream(prompt):
+                if event["type"] == StreamEventEnum.TOOL_START:
+                    status.write(f"Running `{event['content']}`...")
+                elif event["type"] == StreamEventEnum.TOOL_END:
+                    status.write(f"`{event['content']}` done.")
+                elif event["type"] == StreamEventEnum.TOKEN:
+                    response += event["content"]
+                    placeholder.markdown(response + "▌")
+                elif event["type"] == StreamEventEnum.FINAL:
+                    response = event["content"]
+            status.update(label="Done", state="complete")
+            placeholder.markdown(response)
+            st.session_state.messages.append({"role": "assistant", "content": response})
+        except Exception as e:
+            status.update(label="Failed", state="error")
+            st.error(f"Error: {str(e)}")
\ No newline at end of file
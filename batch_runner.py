@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from main import initialize_backend, process_message
+from src.core.llm import llm_registry
+from src.core.metrics import metrics
+
+
+def read_items(input_path: str, id_field: str, question_field: str) -> list[dict]:
+    """Read the questions of a JSONL file.
+
+    Args:
+        input_path (str): The JSONL file, one object per line.
+        id_field (str): The field holding the item id, the line number is used when it is missing.
+        question_field (str): The field holding the question.
+
+    Returns:
+        list[dict]: `{"id": ..., "question": ...}` items in file order.
+    """
+    items = []
+    with open(input_path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            items.append({
+                "id": str(record.get(id_field, line_number)),
+                "question": record[question_field],
+            })
+    return items
+
+
+def read_done_ids(output_path: str) -> set[str]:
+    """Read the ids answered by a previous run, so an interrupted run resumes where it stopped.
+
+    Args:
+        output_path (str): The output JSONL file.
+
+    Returns:
+        set[str]: Ids of the items answered without error.
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    done_ids = set()
+    with open(output_path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line of a killed run may be partially written
+                continue
+            if record.get("error") is None:
+                done_ids.add(record["id"])
+    return done_ids
+
+
+async def run_item(graph, item: dict, retries: int, retry_delay: float, timeout: float) -> dict:
+    """Answer one question, retrying failures with exponential backoff.
+
+    Args:
+        graph (CompiledStateGraph): The compiled agent graph.
+        item (dict): The `{"id": ..., "question": ...}` item.
+        retries (int): Number of retries after the first attempt.
+        retry_delay (float): Delay before the first retry, doubled on every retry.
+        timeout (float): Time limit of one attempt in seconds.
+
+    Returns:
+        dict: The item with its answer or last error, the latency of the successful (or last) attempt and the attempts made.
+    """
+    for attempt in range(retries + 1):
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                answer = await process_message(graph, item["question"])
+            return {**item, "answer": answer, "error": None, "latency_seconds": time.perf_counter() - started_at, "attempts": attempt + 1}
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            latency = time.perf_counter() - started_at
+            if attempt < retries:
+                print(f"Item {item['id']} failed ({error}), retrying.")
+                await asyncio.sleep(retry_delay * 2 ** attempt)
+
+    return {**item, "answer": None, "error": error, "latency_seconds": latency, "attempts": retries + 1}
+
+
+async def run_batch(args: argparse.Namespace):
+    items = read_items(args.input, args.id_field, args.question_field)
+    done_ids = read_done_ids(args.output)
+    pending = [item for item in items if item["id"] not in done_ids]
+    print(f"{len(items)} questions, {len(items) - len(pending)} already answered, {len(pending)} to run.")
+    if not pending:
+        return
+
+    db, graph = await initialize_backend()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = []
+
+    try:
+        with open(args.output, "a", encoding="utf-8") as output:
+
+            async def run(item: dict) -> None:
+                async with semaphore:
+                    result = await run_item(graph, item, args.retries, args.retry_delay, args.timeout)
+                # one line per item as soon as it is done, so a killed run loses nothing
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                results.append(result)
+                print(f"[{len(results)}/{len(pending)}] {item['id']}: {'failed' if result['error'] else 'ok'} in {result['latency_seconds']:.2f}s")
+
+            started_at = time.perf_counter()
+            async with asyncio.TaskGroup() as task_group:
+                for item in pending:
+                    task_group.create_task(run(item))
+            elapsed = time.perf_counter() - started_at
+    finally:
+        await llm_registry.aclose()
+        await db.pg_pool_close()
+        metrics.write_file()
+
+    latencies = [result["latency_seconds"] for result in results if result["error"] is None]
+    failed = len(results) - len(latencies)
+    print(f"\n{len(latencies)} answered, {failed} failed in {elapsed:.1f}s ({len(latencies) / elapsed:.2f} questions/sec).")
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"Latency p50 {quantiles[49]:.2f}s, p95 {quantiles[94]:.2f}s, p99 {quantiles[98]:.2f}s.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer the questions of a JSONL file through the agent graph.")
+    parser.add_argument("input", help="JSONL file with one question object per line")
+    parser.add_argument("output", help="JSONL file the answers are appended to, reruns skip the answered ids")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--question-field", default="question")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--retry-delay", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="time limit of one attempt in seconds")
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(args))
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import time
+
+from langchain_core.documents import Document
+
+from src.core.config import app_config
+from src.core.embedding import FakeEmbeddings
+from src.modules.services.embedding_service import EmbeddingService
+
+
+async def measure(docs: list[Document], batch_size: int, max_concurrency: int, latency_ms: int) -> float:
+    """Embed the documents with the fake backend and a no-op writer.
+
+    Args:
+        docs (list[Document]): The documents to embed.
+        batch_size (int): Number of documents per request.
+        max_concurrency (int): Maximum number of requests in flight.
+        latency_ms (int): Simulated latency of a single request.
+
+    Returns:
+        float: Throughput in documents per second.
+    """
+    async def discard(batch: list[Document], vectors: list[list[float]]) -> None:
+        return None
+
+    embeddings = FakeEmbeddings(size=app_config.embedding_dimension, latency_seconds=latency_ms / 1000)
+    service = EmbeddingService(embeddings, batch_size=batch_size, max_concurrency=max_concurrency)
+
+    started_at = time.perf_counter()
+    await service.arun(docs, on_batch=discard)
+    return len(docs) / (time.perf_counter() - started_at)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure embedding throughput offline with the fake backend.")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=int, default=app_config.fake_embedding_latency_ms)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    docs = [Document(page_content=f"page {i} " * 200, metadata={"page": i}) for i in range(args.docs)]
+
+    results = []
+    for batch_size in args.batch_sizes:
+        for max_concurrency in args.concurrency:
+            throughput = await measure(docs, batch_size, max_concurrency, args.latency_ms)
+            results.append((batch_size, max_concurrency, throughput))
+
+    print(f"\n{'batch_size':>10} {'concurrency':>11} {'docs/sec':>10}")
+    for batch_size, max_concurrency, throughput in results:
+        print(f"{batch_size:>10} {max_concurrency:>11} {throughput:>10,.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import httpx
+import statistics
+import time
+
+
+async def measure(client: httpx.AsyncClient, url: str, message: str, requests: int, concurrency: int) -> dict[str, float]:
+    """Send chat requests with a fixed number of concurrent clients.
+
+    Args:
+        client (httpx.AsyncClient): The HTTP client.
+        url (str): The chat endpoint.
+        message (str): The message of every request.
+        requests (int): Total number of requests.
+        concurrency (int): Number of concurrent clients.
+
+    Returns:
+        dict[str, float]: Throughput, latency percentiles and error count.
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started_at = time.perf_counter()
+            try:
+                response = await client.post(url, json={"message": message})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started_at)
+            except httpx.HTTPError:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": quantiles[49] if quantiles else 0.0,
+        "p95": quantiles[94] if quantiles else 0.0,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure chat throughput of a running server, e.g. one started with LLM_BACKEND=fake.")
+    parser.add_argument("--url", default="http://localhost:8000/chat")
+    parser.add_argument("--message", default="How many fraudulent transactions are there per merchant category?")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        for concurrency in args.concurrency:
+            results.append((concurrency, await measure(client, args.url, args.message, args.requests, concurrency)))
+
+    print(f"\n{'concurrency':>11} {'req/sec':>9} {'p50 (s)':>8} {'p95 (s)':>8} {'errors':>6}")
+    for concurrency, result in results:
+        print(f"{concurrency:>11} {result['throughput']:>9,.2f} {result['p50']:>8.3f} {result['p95']:>8.3f} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,291 @@
+import os
+import tempfile
+
+# the suite runs offline: stand-ins replace OpenRouter and Langfuse, and the caches are disabled
+# so every call takes the uncached path; this must happen before the configuration is read
+BENCH_DIR = tempfile.mkdtemp(prefix="fraud-bench-")
+os.environ.update({
+    "LLM_BACKEND": "fake",
+    "EMBEDDING_BACKEND": "fake",
+    "PROMPT_BACKEND": "local",
+    "TABULAR_FILENAME": os.path.join(BENCH_DIR, "transactions.csv"),
+    "PDF_FILENAME": os.path.join(BENCH_DIR, "report.pdf"),
+    "TABULAR_TABLE_NAME": "bench_fraud",
+    "PDF_VECTOR_TABLE_NAME": "bench_pdf",
+    "SQL_CACHE_SIZE": "0",
+    "QUERY_EMBEDDING_CACHE_SIZE": "0",
+    "QUERY_EMBEDDING_CACHE_POSTGRES": "false",
+})
+for key in ("OPENROUTER_API_KEY", "LANGFUSE_SECRET_KEY", "LANGFUSE_PUBLIC_KEY", "LANGFUSE_BASE_URL"):
+    os.environ.setdefault(key, "offline")
+
+import argparse
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pymupdf
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+
+from src.core.config import app_config
+from src.core.langfuse import LocalPromptStore
+from src.core.llm import llm_registry
+from src.core.metrics import metrics
+from src.database import Database
+from src.modules.services.fraud_records_service import fraud_records_service
+from src.modules.services.pdf_service import PdfParserService
+from src.modules.services.retrieval_service import pdf_retrieval_service
+from src.modules.services.tabular_data_service import TabularDataService, get_rollup_table_names
+from src.modules.tools.pdf_tool import search_pdf_contents
+
+
+# metric name suffix -> whether higher values are better, used to detect regressions
+METRIC_DIRECTIONS = {
+    "_per_sec": True,
+    "_ms": False,
+    "_seconds": False,
+}
+
+WORDS = ["fraud", "card", "merchant", "transaction", "account", "risk", "chargeback", "identity", "payment", "alert"]
+
+
+def write_transactions_csv(path: str, rows: int) -> None:
+    """Write a deterministic CSV with the columns of the Kaggle fraud dataset the ingestion reads.
+
+    Args:
+        path (str): The CSV file.
+        rows (int): Number of transactions.
+    """
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2020-01-01")
+    pd.DataFrame({
+        "trans_date_trans_time": (start + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86_400, rows)), unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+        "merchant": [f"merchant_{i}" for i in rng.integers(0, 500, rows)],
+        "category": rng.choice(["grocery_pos", "shopping_net", "travel", "gas_transport", "misc_net"], rows),
+        "gender": rng.choice(["M", "F"], rows),
+        "state": rng.choice(["CA", "NY", "TX", "FL", "WA"], rows),
+        "job": rng.choice(["Engineer", "Teacher", "Nurse", "Lawyer"], rows),
+        "dob": (pd.Timestamp("1950-01-01") + pd.to_timedelta(rng.integers(0, 50 * 365, rows), unit="D")).strftime("%Y-%m-%d"),
+        "is_fraud": (rng.random(rows) < 0.01).astype(int),
+    }).to_csv(path, index=False)
+
+
+def write_report_pdf(path: str, pages: int) -> None:
+    """Write a deterministic PDF with a few paragraphs per page.
+
+    Args:
+        path (str): The PDF file.
+        pages (int): Number of pages.
+    """
+    rng = np.random.default_rng(0)
+    with pymupdf.open() as document:
+        for page_number in range(pages):
+            page = document.new_page()
+            text = "\n\n".join(
+                f"Section {page_number}.{paragraph}. " + " ".join(rng.choice(WORDS, 80))
+                for paragraph in range(4)
+            )
+            page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontsize=9)
+        document.save(path)
+
+
+def latency_stats(latencies: list[float], prefix: str) -> dict[str, float]:
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        f"{prefix}_p50_ms": quantiles[49] * 1000,
+        f"{prefix}_p95_ms": quantiles[94] * 1000,
+    }
+
+
+async def timed_calls(calls: list[Callable[[], Awaitable]], concurrency: int) -> tuple[list[float], float]:
+    """Run calls with bounded concurrency and time each of them.
+
+    Args:
+        calls (list[Callable[[], Awaitable]]): The calls to run.
+        concurrency (int): Maximum number of calls in flight.
+
+    Returns:
+        tuple[list[float], float]: Latency of every call and the total elapsed time, in seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def run(call: Callable[[], Awaitable]) -> None:
+        async with semaphore:
+            started_at = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    async with asyncio.TaskGroup() as task_group:
+        for call in calls:
+            task_group.create_task(run(call))
+    return latencies, time.perf_counter() - started_at
+
+
+async def reset_tables(db: Database) -> None:
+    """Drop the benchmark tables and their manifest, so every run ingests from scratch.
+    """
+    async with db.get_postgres_db() as conn, conn.cursor() as cursor:
+        for rollup in get_rollup_table_names():
+            await cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {rollup}")
+        await cursor.execute(f"DROP TABLE IF EXISTS {app_config.tabular_table_name} CASCADE")
+        await cursor.execute(f"DROP TABLE IF EXISTS {app_config.pdf_vector_table_name} CASCADE")
+        await cursor.execute("SELECT to_regclass(%s)", (app_config.ingestion_manifest_table_name,))
+        if (await cursor.fetchone())[0] is not None:
+            await cursor.execute(
+                f"DELETE FROM {app_config.ingestion_manifest_table_name} WHERE source = ANY(%s)",
+                ([app_config.tabular_table_name, app_config.pdf_vector_table_name],),
+            )
+        await conn.commit()
+
+
+async def bench_tabular_load(db: Database, rows: int) -> dict[str, float]:
+    write_transactions_csv(app_config.tabular_filename, rows)
+    started_at = time.perf_counter()
+    await TabularDataService(db).process()
+    elapsed = time.perf_counter() - started_at
+    return {"rows": rows, "tabular_load_seconds": elapsed, "tabular_load_rows_per_sec": rows / elapsed}
+
+
+async def bench_pdf_ingest(db: Database, pages: int) -> dict[str, float]:
+    write_report_pdf(app_config.pdf_filename, pages)
+    started_at = time.perf_counter()
+    await PdfParserService(db).process()
+    elapsed = time.perf_counter() - started_at
+
+    async with db.get_postgres_db() as conn, conn.cursor() as cursor:
+        await cursor.execute(f"SELECT COUNT(*) FROM {app_config.pdf_vector_table_name}")
+        chunks = (await cursor.fetchone())[0]
+
+    return {
+        "pages": pages,
+        "chunks": chunks,
+        "pdf_ingest_seconds": elapsed,
+        "pdf_ingest_pages_per_sec": pages / elapsed,
+        "pdf_ingest_chunks_per_sec": chunks / elapsed,
+    }
+
+
+async def bench_search_pdf_contents(queries: int, concurrency: int) -> dict[str, float]:
+    await pdf_retrieval_service.setup()
+    calls = [
+        lambda i=i: search_pdf_contents.ainvoke({"query": f"{WORDS[i % len(WORDS)]} report section {i}"})
+        for i in range(queries)
+    ]
+    latencies, elapsed = await timed_calls(calls, concurrency)
+    return {**latency_stats(latencies, "search_pdf_contents"), "search_pdf_contents_per_sec": queries / elapsed}
+
+
+async def bench_search_fraud_records(queries: int, concurrency: int) -> dict[str, float]:
+    prompt_store = LocalPromptStore(app_config.local_prompts_path)
+    calls = [
+        lambda i=i: fraud_records_service.asearch(f"how many fraudulent transactions by category, variant {i}", prompt_store)
+        for i in range(queries)
+    ]
+    latencies, elapsed = await timed_calls(calls, concurrency)
+    return {**latency_stats(latencies, "search_fraud_records"), "search_fraud_records_per_sec": queries / elapsed}
+
+
+async def bench_process_message(messages: int, concurrency: int) -> dict[str, float]:
+    # imported here since main builds the shared database objects on import
+    from main import initialize_backend, process_message
+
+    db, graph = await initialize_backend()
+    calls = [
+        lambda i=i: process_message(graph, f"Which merchant categories have the most fraud, and what does the report say? ({i})")
+        for i in range(messages)
+    ]
+    latencies, elapsed = await timed_calls(calls, concurrency)
+    return {**latency_stats(latencies, "process_message"), "process_message_per_sec": messages / elapsed}
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list[str]:
+    """Compare the metrics with a previous run.
+
+    Args:
+        results (dict): The results of this run.
+        baseline_path (str): The results file of the baseline run.
+        tolerance (float): Allowed relative change in the worse direction.
+
+    Returns:
+        list[str]: One line per regressed metric.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+
+    regressions = []
+    for benchmark, values in results.items():
+        for metric, value in values.items():
+            previous = baseline.get(benchmark, {}).get(metric)
+            higher_is_better = next((better for suffix, better in METRIC_DIRECTIONS.items() if metric.endswith(suffix)), None)
+            if not previous or higher_is_better is None:
+                continue
+            change = (value - previous) / previous
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{benchmark}.{metric}: {previous:,.2f} -> {value:,.2f} ({change:+.0%})")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, tools and the agent graph offline against a local Postgres.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="results file of a baseline run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    db = Database()
+    await db.pg_pool_open()
+    try:
+        await reset_tables(db)
+        results = {
+            "tabular_load": await bench_tabular_load(db, args.rows),
+            "pdf_ingest": await bench_pdf_ingest(db, args.pages),
+            "search_pdf_contents": await bench_search_pdf_contents(args.queries, args.concurrency),
+            "search_fraud_records": await bench_search_fraud_records(args.queries, args.concurrency),
+            "process_message": await bench_process_message(args.messages, args.concurrency),
+        }
+    finally:
+        await llm_registry.aclose()
+        await db.pg_pool_close()
+        metrics.write_file()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            **vars(args),
+            "fake_llm_latency_ms": app_config.fake_llm_latency_ms,
+            "fake_embedding_latency_ms": app_config.fake_embedding_latency_ms,
+            "embedding_dimension": app_config.embedding_dimension,
+            "tabular_query_backend": app_config.tabular_query_backend.value,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print()
+    for benchmark, values in results.items():
+        for metric, value in values.items():
+            print(f"{benchmark:>20} {metric:<36} {value:>12,.2f}")
+    print(f"\nSaved results to {args.output}.")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import numpy as np
+import time
+
+from src.database import Database
+from src.modules.services.vector_index_service import get_vector_type
+
+
+def to_vector_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+
+async def search(db: Database, table: str, vector_type: str, query: str, k: int, settings: list[str]) -> tuple[list[int], float]:
+    """Run one nearest-neighbour query with the given planner settings.
+
+    Args:
+        db (Database): The database.
+        table (str): The benchmark table.
+        vector_type (str): The type of the embedding column.
+        query (str): The query vector literal.
+        k (int): Number of neighbours.
+        settings (list[str]): `SET LOCAL` statements applied before the query.
+
+    Returns:
+        tuple[list[int], float]: The neighbour ids and the query latency in milliseconds.
+    """
+    async with db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+        for setting in settings:
+            await cursor.execute(f"SET LOCAL {setting}")
+        started_at = time.perf_counter()
+        await cursor.execute(f"SELECT id FROM {table} ORDER BY embedding <=> %s::{vector_type} LIMIT %s", (query, k))
+        rows = await cursor.fetchall()
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        await db_conn.rollback()
+    return [row[0] for row in rows], latency_ms
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare recall and latency of ANN indexes against exact search.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--hnsw-ef-search", type=int, nargs="+", default=[10, 40, 100])
+    parser.add_argument("--ivfflat-lists", type=int, default=100)
+    parser.add_argument("--ivfflat-probes", type=int, nargs="+", default=[1, 10, 30])
+    args = parser.parse_args()
+
+    table = "vector_index_benchmark"
+    vector_type = get_vector_type(args.dimension)
+    ops = vector_type.split("(")[0] + "_cosine_ops"
+    rng = np.random.default_rng(0)
+    db = Database()
+    await db.pg_pool_open()
+
+    try:
+        async with db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            await cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            await cursor.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, embedding {vector_type} NOT NULL)")
+            async with cursor.copy(f"COPY {table} (id, embedding) FROM STDIN") as copy:
+                for row_id in range(args.rows):
+                    await copy.write_row((row_id, to_vector_literal(rng.standard_normal(args.dimension))))
+            await db_conn.commit()
+
+        queries = [to_vector_literal(rng.standard_normal(args.dimension)) for _ in range(args.queries)]
+
+        exact = [await search(db, table, vector_type, query, args.k, ["enable_indexscan = off"]) for query in queries]
+        results = [("exact", "-", 1.0, float(np.mean([latency for _, latency in exact])))]
+
+        async def measure(index: str, settings: list[str], knob: str) -> None:
+            recalls, latencies = [], []
+            for query, (exact_ids, _) in zip(queries, exact):
+                ids, latency = await search(db, table, vector_type, query, args.k, settings)
+                recalls.append(len(set(ids) & set(exact_ids)) / args.k)
+                latencies.append(latency)
+            results.append((index, knob, float(np.mean(recalls)), float(np.mean(latencies))))
+
+        async with db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            started_at = time.perf_counter()
+            await cursor.execute(f"CREATE INDEX {table}_hnsw ON {table} USING hnsw (embedding {ops})")
+            await db_conn.commit()
+            print(f"HNSW build: {time.perf_counter() - started_at:.1f}s")
+        for ef_search in args.hnsw_ef_search:
+            await measure("hnsw", [f"hnsw.ef_search = {ef_search}"], f"ef_search={ef_search}")
+
+        async with db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(f"DROP INDEX {table}_hnsw")
+            started_at = time.perf_counter()
+            await cursor.execute(
+                f"CREATE INDEX {table}_ivfflat ON {table} USING ivfflat (embedding {ops}) WITH (lists = {args.ivfflat_lists})"
+            )
+            await db_conn.commit()
+            print(f"IVFFlat build: {time.perf_counter() - started_at:.1f}s")
+        for probes in args.ivfflat_probes:
+            await measure("ivfflat", [f"ivfflat.probes = {probes}"], f"probes={probes}")
+
+        print(f"\n{'index':<8} {'knob':<14} {'recall@' + str(args.k):>9} {'avg ms':>8}")
+        for index, knob, recall, latency in results:
+            print(f"{index:<8} {knob:<14} {recall:>9.3f} {latency:>8.2f}")
+    finally:
+        async with db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            await db_conn.commit()
+        await db.pg_pool_close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
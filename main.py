@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from uuid import uuid4
 
 from langchain_core.messages import HumanMessage
@@ -6,8 +7,17 @@ from langgraph.graph.state import CompiledStateGraph
 
 from src.core.langfuse import LangfuseConfig
 from src.database import Database
+from src.database.checkpointer import get_checkpoint_durability
 from src.graph import AgentGraph
-from src.modules.schemas.state_schema import Configuration, State
+from src.modules.services.answer_cache_service import answer_cache_service
+from src.modules.services.retrieval_service import pdf_retrieval_service
+from src.modules.const.enum import AgentEnum, StreamEventEnum, ToolEnum
+from src.modules.schemas.state_schema import Configuration, State, StreamEvent
+
+
+PREFETCH_NODES = {tool.value for tool in ToolEnum}
+# the answer comes from the agent's model node, or from the supervisor node itself with the prefetch topology
+ANSWER_NODES = {"model", AgentEnum.SUPERVISOR.value}
 
 
 async def initialize_backend() -> tuple[Database, CompiledStateGraph[State, Configuration]]:
@@ -19,6 +29,8 @@ async def initialize_backend() -> tuple[Database, CompiledStateGraph[State, Conf
     db = Database()
     await db.pg_pool_open()
     await db.setup_checkpointer()
+    await pdf_retrieval_service.setup()
+    await answer_cache_service.setup()
 
     langfuse_config = LangfuseConfig()
     langfuse_config.setup()
@@ -29,19 +41,20 @@ async def initialize_backend() -> tuple[Database, CompiledStateGraph[State, Conf
     return db, graph
 
 
-async def process_message(graph, message: str) -> str:
+async def process_message(graph, message: str, thread_id: str | None = None) -> str:
     """Process a user message and return the response.
 
     Args:
         graph (CompiledStateGraph): The compiled agent graph.
         message (str): The user message.
+        thread_id (str | None, optional): The conversation thread, continued from its checkpoint. Defaults to None, a new thread.
     
     Returns:
         str: The response from the agent.
     """
     config: RunnableConfig = {
         "configurable": {
-            "thread_id": str(uuid4()),
+            "thread_id": thread_id or str(uuid4()),
         },
     }
     
@@ -52,6 +65,53 @@ async def process_message(graph, message: str) -> str:
             ],
         },
         config=config,
+        durability=get_checkpoint_durability(),
     )
     
-    return result["messages"][-1].content
\ No newline at end of file
+    return result["messages"][-1].content
+
+
+async def stream_message(graph, message: str, thread_id: str | None = None) -> AsyncIterator[StreamEvent]:
+    """Process a user message and stream the tool progress and the answer tokens as they arrive.
+
+    Only tokens of the supervisor model are streamed, the LLM calls made inside tools are not. The
+    last event holds the complete answer, which may differ from the streamed tokens when the model
+    wrote text before calling a tool.
+
+    Args:
+        graph (CompiledStateGraph): The compiled agent graph.
+        message (str): The user message.
+        thread_id (str | None, optional): The conversation thread, continued from its checkpoint. Defaults to None, a new thread.
+
+    Yields:
+        StreamEvent: Tool start and end events with the tool name, answer tokens, then the final answer.
+    """
+    config: RunnableConfig = {
+        "configurable": {
+            "thread_id": thread_id or str(uuid4()),
+        },
+    }
+
+    async for event in graph.astream_events(
+        {
+            "messages": [
+                HumanMessage(content=message),
+            ],
+        },
+        config=config,
+        version="v2",
+        durability=get_checkpoint_durability(),
+    ):
+        kind = event["event"]
+        # with the prefetch topology the tools run as graph nodes named after them
+        is_prefetch_node = event["name"] in PREFETCH_NODES and event["metadata"].get("langgraph_node") == event["name"]
+        if kind == "on_tool_start" or (kind == "on_chain_start" and is_prefetch_node):
+            yield {"type": StreamEventEnum.TOOL_START, "content": event["name"]}
+        elif kind == "on_tool_end" or (kind == "on_chain_end" and is_prefetch_node):
+            yield {"type": StreamEventEnum.TOOL_END, "content": event["name"]}
+        elif kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") in ANSWER_NODES:
+            content = event["data"]["chunk"].content
+            if isinstance(content, str) and content:
+                yield {"type": StreamEventEnum.TOKEN, "content": content}
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            yield {"type": StreamEventEnum.FINAL, "content": event["data"]["output"]["messages"][-1].content}
\ No newline at end of file
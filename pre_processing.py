@@ -1,5 +1,6 @@
 import asyncio
 
+from src.core.metrics import metrics
 from src.database import Database
 from src.modules.services.pdf_service import PdfParserService
 from src.modules.services.tabular_data_service import TabularDataService
@@ -11,12 +12,14 @@ tabular_data_service = TabularDataService(db)
 
 async def pre_process():
     try:
+        await db.pg_pool_open()
         await pdf_parser_service.process()
         await tabular_data_service.process()
     except Exception as e:
         raise RuntimeError(f"An error occurred during pre-processing: {e}") from e
     finally:
-        await db._pg_pool.close()
+        await db.pg_pool_close()
+        metrics.write_file()
 
 if __name__ == "__main__":
     asyncio.run(pre_process())  # run once
\ No newline at end of file
@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+import time
+
+from src.core.config import app_config
+from src.core.metrics import metrics
+from src.database import Database
+from src.modules.services.checkpoint_service import CheckpointService
+
+
+db = Database()
+checkpoint_service = CheckpointService(db)
+
+def print_table_stats(stats: dict[str, dict[str, int]]) -> None:
+    for table, values in sorted(stats.items()):
+        print(f"{table:>18} {values['rows']:>12,} rows {values['bytes'] / 1024 ** 2:>10,.1f} MB")
+
+async def prune(ttl_seconds: int, keep_per_thread: int, batch_size: int, interval: float):
+    try:
+        await db.pg_pool_open()
+        while True:
+            print_table_stats(await checkpoint_service.atable_stats())
+
+            started_at = time.perf_counter()
+            deleted = await checkpoint_service.aprune(ttl_seconds, keep_per_thread, batch_size)
+            print(
+                f"Deleted {deleted['checkpoints']:,} checkpoints, {deleted['writes']:,} writes and "
+                f"{deleted['blobs']:,} blobs in {time.perf_counter() - started_at:.1f}s."
+            )
+
+            print_table_stats(await checkpoint_service.atable_stats())
+            if interval <= 0:
+                break
+            await asyncio.sleep(interval)
+    finally:
+        await db.pg_pool_close()
+        metrics.write_file()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete expired checkpoints, their writes and orphaned blobs in bounded batches.")
+    parser.add_argument("--ttl-seconds", type=int, default=app_config.checkpoint_ttl_seconds, help="maximum checkpoint age, 0 keeps any age")
+    parser.add_argument("--keep-per-thread", type=int, default=app_config.checkpoint_keep_per_thread, help="newest checkpoints kept per thread, 0 keeps all")
+    parser.add_argument("--batch-size", type=int, default=app_config.checkpoint_prune_batch_size)
+    parser.add_argument("--interval", type=float, default=0, help="repeat every N seconds, 0 runs once")
+    args = parser.parse_args()
+
+    asyncio.run(prune(args.ttl_seconds, args.keep_per_thread, args.batch_size, args.interval))
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import uvicorn
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from uuid import uuid4
+
+from main import initialize_backend, process_message, stream_message
+from src.core.config import app_config
+from src.core.llm import llm_registry
+from src.core.metrics import metrics
+from src.modules.const.enum import CheckpointModeEnum
+from src.modules.services.checkpoint_service import CheckpointService
+
+
+class ServerBusyError(Exception):
+    """Raised when no request slot frees up within the queue timeout.
+    """
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Initialize the backend on startup, then close the pools once in-flight requests are done.
+
+    Args:
+        app (Starlette): The application.
+    """
+    app.state.ready = False
+    app.state.in_flight = 0
+    app.state.semaphore = asyncio.Semaphore(app_config.server_max_concurrency)
+    app.state.db, app.state.graph = await initialize_backend()
+    app.state.checkpoint_service = CheckpointService(app.state.db)
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await llm_registry.aclose()
+        await app.state.db.get_pgvector_engine().close()
+        await app.state.db.pg_pool_close()
+        print("Closed the database pools.")
+        metrics.write_file()
+
+
+@asynccontextmanager
+async def acquire_slot(request: Request) -> AsyncIterator[None]:
+    """Hold one of the `server_max_concurrency` request slots, waiting at most `server_queue_timeout_seconds`.
+
+    Args:
+        request (Request): The request.
+
+    Raises:
+        ServerBusyError: If no slot freed up in time.
+    """
+    state = request.app.state
+    try:
+        await asyncio.wait_for(state.semaphore.acquire(), app_config.server_queue_timeout_seconds)
+    except TimeoutError as e:
+        raise ServerBusyError() from e
+
+    state.in_flight += 1
+    try:
+        yield
+    finally:
+        state.in_flight -= 1
+        state.semaphore.release()
+
+
+async def read_chat_request(request: Request) -> tuple[str, str]:
+    """Read the user message and conversation thread of a chat request.
+
+    Args:
+        request (Request): The request with a `{"message": ..., "thread_id": ...}` JSON body, `thread_id` is optional.
+
+    Returns:
+        tuple[str, str]: The user message and the thread id, a new one when the request has none.
+    """
+    try:
+        body = await request.json()
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail="The body must be JSON.") from e
+
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise HTTPException(status_code=400, detail="The body must have a non-empty `message`.")
+
+    thread_id = body.get("thread_id") or str(uuid4())
+    if not isinstance(thread_id, str) or len(thread_id) > 128:
+        raise HTTPException(status_code=400, detail="`thread_id` must be a string of at most 128 characters.")
+    return message, thread_id
+
+
+async def chat(request: Request) -> JSONResponse:
+    """Answer a chat message, continuing the conversation of `thread_id` when given.
+
+    Args:
+        request (Request): The request with a `{"message": ..., "thread_id": ...}` JSON body.
+
+    Returns:
+        JSONResponse: `{"response": ..., "thread_id": ...}`, the thread id continues the conversation.
+    """
+    message, thread_id = await read_chat_request(request)
+    async with acquire_slot(request), asyncio.timeout(app_config.server_request_timeout_seconds):
+        response = await process_message(request.app.state.graph, message, thread_id)
+    return JSONResponse({"response": response, "thread_id": thread_id})
+
+
+async def chat_stream(request: Request) -> StreamingResponse:
+    """Stream the answer to a chat message as newline-delimited JSON events.
+
+    The slot is taken once streaming starts, so a busy server or a timeout is reported as an
+    `error` event rather than a status code.
+
+    Args:
+        request (Request): The request with a `{"message": ..., "thread_id": ...}` JSON body.
+
+    Returns:
+        StreamingResponse: One `{"type": ..., "content": ...}` object per line, with the thread id in the `X-Thread-Id` header.
+    """
+    message, thread_id = await read_chat_request(request)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async with acquire_slot(request), asyncio.timeout(app_config.server_request_timeout_seconds):
+                async for event in stream_message(request.app.state.graph, message, thread_id):
+                    yield json.dumps({"type": event["type"].value, "content": event["content"]}) + "\n"
+        except ServerBusyError:
+            yield json.dumps({"type": "error", "content": "The server is busy, retry later."}) + "\n"
+        except TimeoutError:
+            yield json.dumps({"type": "error", "content": "The request timed out."}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers={"X-Thread-Id": thread_id})
+
+
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness probe, up as long as the event loop answers.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        JSONResponse: `{"status": "ok"}`.
+    """
+    return JSONResponse({"status": "ok"})
+
+
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness probe, ready once the backend is initialized and Postgres answers.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        JSONResponse: The status and the number of requests in flight, with 503 when not ready.
+    """
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+
+    try:
+        async with asyncio.timeout(app_config.postgres_timeout), state.db.get_postgres_db() as conn:
+            await conn.execute("SELECT 1")
+    except Exception as e:
+        return JSONResponse({"status": "unavailable", "detail": str(e)}, status_code=503)
+
+    return JSONResponse({"status": "ready", "in_flight": state.in_flight})
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Serve the stage latencies, pool wait times, counters and checkpoint table sizes in the Prometheus text format.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        PlainTextResponse: The exposition text.
+    """
+    state = request.app.state
+    if getattr(state, "ready", False) and app_config.checkpoint_mode in (CheckpointModeEnum.SHALLOW, CheckpointModeEnum.POSTGRES):
+        try:
+            await state.checkpoint_service.atable_stats()
+        except Exception as e:
+            print(f"Failed to read the checkpoint table sizes: {e}")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+async def server_busy(request: Request, exc: ServerBusyError) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "The server is busy, retry later."},
+        status_code=503,
+        headers={"Retry-After": str(int(app_config.server_queue_timeout_seconds) or 1)},
+    )
+
+
+async def request_timeout(request: Request, exc: TimeoutError) -> JSONResponse:
+    return JSONResponse({"detail": "The request timed out."}, status_code=504)
+
+
+app = Starlette(
+    routes=[
+        Route("/chat", chat, methods=["POST"]),
+        Route("/chat/stream", chat_stream, methods=["POST"]),
+        Route("/healthz", healthz, methods=["GET"]),
+        Route("/readyz", readyz, methods=["GET"]),
+        Route("/metrics", metrics_endpoint, methods=["GET"]),
+    ],
+    exception_handlers={
+        ServerBusyError: server_busy,
+        TimeoutError: request_timeout,
+    },
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    # a single worker keeps every request on one event loop sharing the pools
+    uvicorn.run(
+        app,
+        host=app_config.server_host,
+        port=app_config.server_port,
+        timeout_graceful_shutdown=app_config.server_shutdown_timeout_seconds,
+    )
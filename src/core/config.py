@@ -2,6 +2,20 @@ import os
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.modules.const.enum import (
+    AnswerCacheBackendEnum,
+    CheckpointDurabilityEnum,
+    CheckpointModeEnum,
+    CopyFormatEnum,
+    EmbeddingBackendEnum,
+    GraphTopologyEnum,
+    LlmBackendEnum,
+    LoadMethodEnum,
+    PromptBackendEnum,
+    QueryBackendEnum,
+    VectorIndexEnum,
+)
+
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
@@ -15,16 +29,118 @@ class Config(BaseSettings):
     postgres_port: int
     postgres_db: str
     postgres_timeout: int
+    postgres_pool_min_size: int = 4
+    postgres_pool_max_size: int = 20
 
     langfuse_secret_key: str
     langfuse_public_key: str
     langfuse_base_url: str
+    prompt_backend: PromptBackendEnum = PromptBackendEnum.LANGFUSE
+    local_prompts_path: str = "benchmarks/prompts.json"
 
     openrouter_api_key: str
 
+    embedding_backend: EmbeddingBackendEnum = EmbeddingBackendEnum.OPENROUTER
+    embedding_model: str = "qwen/qwen3-embedding-8b"
+    embedding_dimension: int = 2048
+    embedding_request_dimensions: bool = True
+    embedding_batch_size: int = 32
+    embedding_max_concurrency: int = 4
+    embedding_max_retries: int = 5
+    embedding_retry_initial_delay: float = 1.0
+    fake_embedding_latency_ms: int = 50
+
+    query_embedding_cache_size: int = 1024
+    query_embedding_cache_ttl_seconds: int = 86_400
+    query_embedding_cache_postgres: bool = False
+    query_embedding_cache_table_name: str = "query_embedding_cache"
+
     pdf_vector_table_name: str
     tabular_table_name: str
 
+    pdf_parse_workers: int = 0
+    pdf_parse_pages_per_task: int = 4
+    pdf_chunk_size: int = 2000
+    pdf_chunk_overlap: int = 200
+
+    pdf_vector_index_type: VectorIndexEnum = VectorIndexEnum.HNSW
+    pdf_vector_hnsw_m: int = 16
+    pdf_vector_hnsw_ef_construction: int = 64
+    pdf_vector_hnsw_ef_search: int = 40
+    pdf_vector_ivfflat_lists: int = 100
+    pdf_vector_ivfflat_probes: int = 10
+    pdf_vector_reindex_after_ingest: bool = False
+
+    tabular_load_method: LoadMethodEnum = LoadMethodEnum.COPY
+    tabular_copy_format: CopyFormatEnum = CopyFormatEnum.TEXT
+    tabular_load_batch_size: int = 50_000
+    tabular_stream_chunk_size: int = 100_000
+    tabular_rollups_enabled: bool = True
+    tabular_partition_by_date: bool = False
+    tabular_indexes_enabled: bool = True
+    tabular_query_backend: QueryBackendEnum = QueryBackendEnum.POSTGRES
+    tabular_parquet_dir: str = "data/parquet"
+    duckdb_threads: int = 0
+
+    sql_schema_tables: list[str] = []
+    sql_schema_hidden_columns: list[str] = ["ingest_batch"]
+    sql_schema_cache_ttl_seconds: int = 300
+    sql_schema_version: str = "1"
+    sql_cache_size: int = 512
+    sql_cache_ttl_seconds: int = 86_400
+    sql_result_cache_ttl_seconds: int = 600
+    sql_cache_data_version_check_seconds: int = 10
+    sql_result_server_cursor: bool = True
+    sql_result_fetch_size: int = 100
+    sql_result_max_rows: int = 200
+    sql_result_max_bytes: int = 16_000
+    sql_statement_timeout_ms: int = 15_000
+    sql_governor_enabled: bool = True
+    sql_governor_max_cost: float = 1_000_000.0
+    sql_governor_max_rows: int = 10_000
+
+    llm_backend: LlmBackendEnum = LlmBackendEnum.OPENROUTER
+    fake_llm_latency_ms: int = 500
+    fake_llm_tools: list[str] = []
+    fake_llm_response: str = "SELECT merchant_category, COUNT(*) AS transaction_count FROM {table} GROUP BY merchant_category"
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_timeout_seconds: float = 120.0
+
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_max_concurrency: int = 32
+    server_queue_timeout_seconds: float = 5.0
+    server_request_timeout_seconds: float = 120.0
+    server_shutdown_timeout_seconds: int = 30
+
+    graph_topology: GraphTopologyEnum = GraphTopologyEnum.AGENT
+    prefetch_tools: list[str] = ["search_fraud_records", "search_pdf_contents"]
+
+    answer_cache_backend: AnswerCacheBackendEnum = AnswerCacheBackendEnum.NONE
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl_seconds: int = 86_400
+    answer_cache_max_entries: int = 2000
+    answer_cache_version_check_seconds: int = 10
+    answer_cache_table_name: str = "answer_cache"
+
+    checkpoint_mode: CheckpointModeEnum = CheckpointModeEnum.POSTGRES
+    checkpoint_durability: CheckpointDurabilityEnum = CheckpointDurabilityEnum.ASYNC
+    checkpoint_ttl_seconds: int = 2_592_000
+    checkpoint_keep_per_thread: int = 20
+    checkpoint_prune_batch_size: int = 1000
+
+    history_max_messages: int = 12
+    history_window_messages: int = 6
+    history_summary_enabled: bool = True
+    history_summary_max_chars: int = 4000
+
+    metrics_enabled: bool = True
+    metrics_file: str = ""
+
+    ingestion_incremental: bool = True
+    ingestion_manifest_table_name: str = "ingestion_manifest"
+
 
 def get_config() -> Config:
     return Config()
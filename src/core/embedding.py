@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import numpy as np
+import time
+from pydantic import SecretStr
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from src.core.config import app_config
+from src.modules.const.enum import EmbeddingBackendEnum
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic offline embeddings that simulate the latency of a remote provider.
+
+    The same text always maps to the same unit vector, so search results are reproducible.
+    """
+
+    def __init__(self, size: int, latency_seconds: float = 0.0):
+        self._size = size
+        self._latency_seconds = latency_seconds
+
+    def _embed(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self._size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._latency_seconds)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self._latency_seconds)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self._latency_seconds)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self._latency_seconds)
+        return self._embed(text)
+
+
+def get_embeddings() -> Embeddings:
+    """Create the embedding client selected by the configuration.
+
+    Returns:
+        Embeddings: The embedding client.
+    """
+    if app_config.embedding_backend == EmbeddingBackendEnum.FAKE:
+        return FakeEmbeddings(
+            size=app_config.embedding_dimension,
+            latency_seconds=app_config.fake_embedding_latency_ms / 1000,
+        )
+
+    return OpenAIEmbeddings(
+        model=app_config.embedding_model,
+        dimensions=app_config.embedding_dimension if app_config.embedding_request_dimensions else None,
+        api_key=SecretStr(app_config.openrouter_api_key),
+        base_url="https://openrouter.ai/api/v1",
+    )
@@ -1,16 +1,85 @@
+import json
+
+from langchain_core.callbacks import BaseCallbackHandler
 from langfuse import Langfuse
 from langfuse.langchain import CallbackHandler
 
 from src.core.config import app_config
+from src.modules.const.enum import PromptBackendEnum
+
+
+class LocalPrompt:
+    """Prompt of the local prompt store, exposing the part of the Langfuse prompt API the agents use.
+    """
+
+    def __init__(self, name: str, prompt: str, config: dict, version: int):
+        self.name = name
+        self.prompt = prompt
+        self.config = config
+        self.version = version
+
+    def compile(self, **variables) -> str:
+        """Fill the `{{variable}}` placeholders of the prompt.
+
+        Returns:
+            str: The compiled prompt.
+        """
+        compiled = self.prompt
+        for key, value in variables.items():
+            compiled = compiled.replace("{{" + key + "}}", str(value))
+        return compiled
+
+
+class LocalPromptStore:
+    """Stand-in for the Langfuse client that serves prompts from a JSON file, for offline runs.
+
+    The file maps prompt names to `{"prompt": ..., "config": {...}, "version": ...}`.
+    """
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as file:
+            self._prompts = {
+                name: LocalPrompt(name, entry["prompt"], entry.get("config", {}), entry.get("version", 1))
+                for name, entry in json.load(file).items()
+            }
+
+    def get_prompt(
+        self,
+        name: str,
+        label: str | None = None,
+        cache_ttl_seconds: int | None = None,
+        fallback: str | None = None,
+        **kwargs,
+    ) -> LocalPrompt:
+        """Get a prompt by name, labels are ignored.
+
+        Args:
+            name (str): The prompt name.
+            label (str | None, optional): Ignored. Defaults to None.
+            cache_ttl_seconds (int | None, optional): Ignored. Defaults to None.
+            fallback (str | None, optional): Prompt text used when the file has no such prompt. Defaults to None.
+
+        Returns:
+            LocalPrompt: The prompt.
+        """
+        if name not in self._prompts and fallback is not None:
+            return LocalPrompt(name, fallback, {}, 0)
+        return self._prompts[name]
 
 
 class LangfuseConfig:
-    
+
     def __init__(self):
-        self._client: Langfuse
-        self._callback: CallbackHandler
+        self._client: Langfuse | LocalPromptStore
+        self._callback: CallbackHandler | BaseCallbackHandler
 
     def setup(self):
+        if app_config.prompt_backend == PromptBackendEnum.LOCAL:
+            # no tracing offline, a handler without callbacks keeps the callback list valid
+            self._client = LocalPromptStore(app_config.local_prompts_path)
+            self._callback = BaseCallbackHandler()
+            return
+
         self._client = Langfuse(
             secret_key=app_config.langfuse_secret_key,
             public_key=app_config.langfuse_public_key,
@@ -19,4 +88,4 @@ class LangfuseConfig:
 
         self._callback = CallbackHandler(
             public_key=app_config.langfuse_public_key,
-        )
\ No newline at end of file
+        )
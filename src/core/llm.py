@@ -0,0 +1,231 @@
+import asyncio
+import httpx
+import json
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from pydantic import SecretStr
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_openai import ChatOpenAI
+from langfuse.model import PromptClient
+
+from src.core.config import app_config
+from src.modules.const.enum import LlmBackendEnum
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model that simulates the latency of a remote provider.
+
+    With tools bound, the first turn calls the scripted tools (every bound tool by default) with the
+    last user message as query and the next turn answers from the tool results. Without tools, i.e.
+    for SQL generation, it answers `response`.
+    """
+
+    latency_seconds: float = 0.0
+    response: str = ""
+    scripted_tools: list[str] = []
+    tool_names: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "FakeChatModel":
+        return self.model_copy(update={"tool_names": [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]})
+
+    def _respond(self, messages: list[BaseMessage]) -> AIMessage:
+        if not self.tool_names:
+            return AIMessage(content=self.response)
+
+        tool_results = [message for message in messages if isinstance(message, ToolMessage)]
+        tool_names = [name for name in self.tool_names if not self.scripted_tools or name in self.scripted_tools]
+        if tool_results or not tool_names:
+            return AIMessage(content=f"This is a stub answer based on {len(tool_results)} tool results.")
+
+        query = next((message.content for message in reversed(messages) if isinstance(message, HumanMessage)), "")
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": name, "args": {"query": query}, "id": f"call_{index}"}
+                for index, name in enumerate(tool_names)
+            ],
+        )
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _to_chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                    for index, call in enumerate(message.tool_calls)
+                ],
+            ))
+            return
+        for index, word in enumerate(message.content.split(" ")):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else f" {word}"))
+
+    def _stream(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_seconds)
+        yield from self._to_chunks(self._respond(messages))
+
+    async def _astream(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_seconds)
+        for chunk in self._to_chunks(self._respond(messages)):
+            yield chunk
+
+
+class LlmRegistry:
+    """Reuse chat models and compiled agents across requests.
+
+    Chat models are cached per (model, temperature) and share one keep-alive HTTP connection pool.
+    Agents are cached per name and rebuilt only when the model, temperature or version of their
+    Langfuse prompt changes. Everything is bound to the running event loop and dropped when it
+    changes, since pooled connections can't move between loops.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._http_client: httpx.AsyncClient | None = None
+        self._http_client_closer: asyncio.Task | None = None
+        self._llms: dict[tuple[str, float], BaseChatModel] = {}
+        self._agents: dict[str, tuple[tuple, Any]] = {}
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._discard_http_client()
+            self._loop = loop
+            self._llms.clear()
+            self._agents.clear()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the HTTP client shared by every chat model.
+
+        Returns:
+            httpx.AsyncClient: The client with its keep-alive connection pool.
+        """
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=app_config.llm_max_connections,
+                    max_keepalive_connections=app_config.llm_max_keepalive_connections,
+                ),
+                timeout=httpx.Timeout(app_config.llm_timeout_seconds),
+            )
+            self._http_client_closer = asyncio.get_running_loop().create_task(
+                self._aclose_on_cancel(self._http_client),
+                name="llm_http_client_closer",
+            )
+        return self._http_client
+
+    async def _aclose_on_cancel(self, http_client: httpx.AsyncClient) -> None:
+        """Close the HTTP client once cancelled.
+
+        `asyncio.run` cancels the pending tasks before it closes the loop, so the pooled connections
+        are closed on the loop they belong to, which is no longer possible once it is closed.
+
+        Args:
+            http_client (httpx.AsyncClient): The client owned by the running loop.
+        """
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await http_client.aclose()
+
+    def _discard_http_client(self) -> None:
+        """Forget the HTTP client of the previous loop, closing it on that loop if it still runs.
+        """
+        closer = self._http_client_closer
+        if closer is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(closer.cancel)
+        self._http_client = None
+        self._http_client_closer = None
+
+    def get_llm(self, model: str, temperature: float) -> BaseChatModel:
+        """Get the chat model for a model and temperature.
+
+        Args:
+            model (str): The OpenRouter model name.
+            temperature (float): The sampling temperature.
+
+        Returns:
+            BaseChatModel: The cached chat model, a fake one when the fake backend is configured.
+        """
+        self._check_loop()
+        key = (model, temperature)
+        if key in self._llms:
+            return self._llms[key]
+
+        if app_config.llm_backend == LlmBackendEnum.FAKE:
+            self._llms[key] = FakeChatModel(
+                latency_seconds=app_config.fake_llm_latency_ms / 1000,
+                response=app_config.fake_llm_response.format(table=app_config.tabular_table_name),
+                scripted_tools=app_config.fake_llm_tools,
+            )
+        else:
+            self._llms[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=SecretStr(app_config.openrouter_api_key),
+                base_url="https://openrouter.ai/api/v1",
+                http_async_client=self._get_http_client(),
+            )
+        return self._llms[key]
+
+    def get_prompt_llm(self, prompt: PromptClient) -> BaseChatModel:
+        """Get the chat model configured by a Langfuse prompt.
+
+        Args:
+            prompt (PromptClient): The prompt holding the model and temperature in its config.
+
+        Returns:
+            BaseChatModel: The cached chat model.
+        """
+        return self.get_llm(prompt.config.get("model"), prompt.config.get("temperature", 0.0))
+
+    def get_agent(self, name: str, prompt: PromptClient, build: Callable[[BaseChatModel], Any]) -> Any:
+        """Get the compiled agent of a prompt, building it on first use or after the prompt changed.
+
+        Args:
+            name (str): The agent name.
+            prompt (PromptClient): The prompt configuring the agent model.
+            build (Callable[[BaseChatModel], Any]): Builds the agent around a chat model.
+
+        Returns:
+            Any: The cached agent.
+        """
+        self._check_loop()
+        key = (prompt.config.get("model"), prompt.config.get("temperature", 0.0), prompt.version)
+        cached = self._agents.get(name)
+        if cached is None or cached[0] != key:
+            self._agents[name] = (key, build(self.get_prompt_llm(prompt)))
+            print(f"Built agent {name} for model {key[0]} and prompt version {key[2]}.")
+        return self._agents[name][1]
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and forget the cached models and agents.
+        """
+        if self._http_client_closer is not None:
+            self._http_client_closer.cancel()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._loop = None
+        self._http_client = None
+        self._http_client_closer = None
+        self._llms.clear()
+        self._agents.clear()
+
+
+llm_registry = LlmRegistry()
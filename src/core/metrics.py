@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.core.config import app_config
+
+
+METRICS_PREFIX = "fraud_detection"
+
+# upper bounds in seconds, from a cache lookup to a slow ingestion stage
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+METRIC_HELP = {
+    "stage_duration_seconds": "Duration of a pipeline stage.",
+    "stage_errors_total": "Pipeline stages that raised an error.",
+    "postgres_pool_wait_seconds": "Time spent waiting for a Postgres pool connection.",
+    "ingested_items_total": "Rows or chunks written by ingestion.",
+    "checkpoint_pruned_total": "Checkpoints, writes and blobs deleted by the retention job.",
+    "checkpoint_table_rows": "Estimated rows of a checkpoint table.",
+    "checkpoint_table_bytes": "Total size of a checkpoint table, with indexes and TOAST.",
+    "answer_cache_lookups_total": "Answer cache lookups, by hit or miss.",
+}
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, as in the Prometheus exposition format.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    """In-process histograms, counters and gauges, rendered in the Prometheus text format.
+
+    Nothing is sent anywhere: the metrics are served by the `/metrics` endpoint of the server and
+    written to `metrics_file` when a run ends, so they work fully offline. With `metrics_enabled`
+    off every call is a no-op.
+    """
+
+    def __init__(self):
+        # every Streamlit session records metrics from its own script thread; the PDF parser workers
+        # are separate processes that never reach this registry, so parsing is timed in the parent
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[tuple[tuple[str, str], ...], Histogram]] = {}
+        self._counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self._gauges: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in a histogram.
+
+        Args:
+            name (str): The metric name, without the prefix.
+            value (float): The observed value, in seconds for durations.
+        """
+        if not app_config.metrics_enabled:
+            return
+        key = tuple(sorted((label, str(label_value)) for label, label_value in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            series.setdefault(key, Histogram()).observe(value)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        """Increase a counter.
+
+        Args:
+            name (str): The metric name, without the prefix.
+            amount (float, optional): The increment. Defaults to 1.0.
+        """
+        if not app_config.metrics_enabled:
+            return
+        key = tuple(sorted((label, str(label_value)) for label, label_value in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge.
+
+        Args:
+            name (str): The metric name, without the prefix.
+            value (float): The current value.
+        """
+        if not app_config.metrics_enabled:
+            return
+        key = tuple(sorted((label, str(label_value)) for label, label_value in labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = float(value)
+
+    @contextmanager
+    def span(self, stage: str, **labels: str) -> Iterator[None]:
+        """Time a pipeline stage into `stage_duration_seconds`, counting errors in `stage_errors_total`.
+
+        Works around `await` as well, since only the wall time between entering and leaving is measured.
+
+        Args:
+            stage (str): The stage name.
+
+        Yields:
+            None: Control to the timed block.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment("stage_errors_total", stage=stage, **labels)
+            raise
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - started_at, stage=stage, **labels)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{METRICS_PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{metric}_bucket{format_labels(labels + (('le', str(bound)),))} {count}")
+                    lines.append(f"{metric}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+
+            for metric_type, metric_series in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(metric_series.items()):
+                    metric = f"{METRICS_PREFIX}_{name}"
+                    lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+                    lines.append(f"# TYPE {metric} {metric_type}")
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{metric}{format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path: str | None = None) -> None:
+        """Write the rendered metrics to a file, replacing it atomically.
+
+        Args:
+            path (str | None, optional): The file, `metrics_file` when None. Nothing is written when both are empty.
+        """
+        path = path or app_config.metrics_file
+        if not path or not app_config.metrics_enabled:
+            return
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temp_path, path)
+        print(f"Wrote metrics to {path}.")
+
+
+class LlmTimingCallbackHandler(BaseCallbackHandler):
+    """Time every chat model call into the `llm_call` stage, labelled with the graph node that made it.
+    """
+
+    # called on the event loop rather than in an executor, the handler only touches a dict
+    run_inline = True
+
+    def __init__(self, registry: MetricsRegistry):
+        self._registry = registry
+        self._started: dict[UUID, tuple[float, str]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node", "none")
+        self._started[run_id] = (time.perf_counter(), node)
+
+    def _finish(self, run_id: UUID, failed: bool) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        started_at, node = started
+        self._registry.observe("stage_duration_seconds", time.perf_counter() - started_at, stage="llm_call", node=node)
+        if failed:
+            self._registry.increment("stage_errors_total", stage="llm_call", node=node)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, failed=False)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, failed=True)
+
+
+metrics = MetricsRegistry()
+llm_timing_callback = LlmTimingCallbackHandler(metrics)
@@ -1,11 +1,18 @@
+import time
+
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from langchain_postgres import PGEngine
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from psycopg import AsyncConnection
 from psycopg_pool import AsyncConnectionPool
 
 from src.core.config import app_config
+from src.core.metrics import metrics
+from src.database.checkpointer import ShallowPostgresSaver, TimedPostgresSaver
+from src.modules.const.enum import CheckpointModeEnum
 
 
 def get_postgres_connection_pool() -> AsyncConnectionPool:
@@ -18,7 +25,9 @@ def get_postgres_connection_pool() -> AsyncConnectionPool:
             f"port={app_config.postgres_port}"
         ),
         open=False,
-        timeout=app_config.postgres_timeout,    
+        timeout=app_config.postgres_timeout,
+        min_size=app_config.postgres_pool_min_size,
+        max_size=app_config.postgres_pool_max_size,
     )
     return pool
 
@@ -42,9 +51,15 @@ class Database:
         if self._pg_pool.closed:
             await self._pg_pool.open()
 
+    async def pg_pool_close(self):
+        if not self._pg_pool.closed:
+            await self._pg_pool.close()
+
     @asynccontextmanager
     async def get_postgres_db(self) -> AsyncGenerator[AsyncConnection]:
+        started_at = time.perf_counter()
         async with self._pg_pool.connection() as conn:
+            metrics.observe("postgres_pool_wait_seconds", time.perf_counter() - started_at)
             try:
                 yield conn
             except Exception:
@@ -54,12 +69,24 @@ class Database:
     def get_pgvector_engine(self) -> PGEngine:
         return self._pgvector_engine_pool
     
-    def get_postgres_checkpointer(self) -> AsyncPostgresSaver:
+    def get_checkpointer(self) -> BaseCheckpointSaver | None:
+        """Get the checkpointer of the configured checkpoint mode.
+
+        Returns:
+            BaseCheckpointSaver | None: The checkpointer, None in the `none` mode.
+        """
         if self._checkpointer is None:
-            self._checkpointer = AsyncPostgresSaver(self._pg_pool)
+            if app_config.checkpoint_mode == CheckpointModeEnum.MEMORY:
+                self._checkpointer = InMemorySaver()
+            elif app_config.checkpoint_mode == CheckpointModeEnum.SHALLOW:
+                self._checkpointer = ShallowPostgresSaver(self._pg_pool)
+            elif app_config.checkpoint_mode == CheckpointModeEnum.POSTGRES:
+                self._checkpointer = TimedPostgresSaver(self._pg_pool)
         return self._checkpointer
 
     async def setup_checkpointer(self):
+        if app_config.checkpoint_mode not in (CheckpointModeEnum.SHALLOW, CheckpointModeEnum.POSTGRES):
+            return
         async with self._pg_pool.connection() as conn:
             await conn.set_autocommit(True)
             temp_checkpointer = AsyncPostgresSaver(conn)
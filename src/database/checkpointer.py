@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.types import Durability
+
+from src.core.config import app_config
+from src.core.metrics import metrics
+from src.modules.const.enum import CheckpointModeEnum
+
+
+# blobs hold the non-primitive channel values, keyed by channel version; a blob is garbage once no
+# checkpoint of its thread and namespace points to its version anymore
+DELETE_THREAD_ORPHAN_BLOBS_SQL = """
+    DELETE FROM checkpoint_blobs b
+    WHERE b.thread_id = %s
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id
+        AND c.checkpoint_ns = b.checkpoint_ns
+        AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+    )
+"""
+
+
+def get_checkpoint_durability() -> Durability | None:
+    """Get the durability the graph runs with for the configured checkpoint mode.
+
+    Returns:
+        Durability | None: `exit` for the shallow mode, `checkpoint_durability` otherwise, None without checkpointer.
+    """
+    if app_config.checkpoint_mode == CheckpointModeEnum.NONE:
+        return None
+    if app_config.checkpoint_mode == CheckpointModeEnum.SHALLOW:
+        return "exit"
+    return app_config.checkpoint_durability.value
+
+
+class TimedPostgresSaver(AsyncPostgresSaver):
+    """Postgres checkpointer that records the latency of its writes in the `checkpoint_write` stage.
+    """
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with metrics.span("checkpoint_write", kind="checkpoint"):
+            return await super().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with metrics.span("checkpoint_write", kind="writes"):
+            await super().aput_writes(config, writes, task_id, task_path)
+
+
+class ShallowPostgresSaver(TimedPostgresSaver):
+    """Postgres checkpointer that keeps only the latest checkpoint of every thread.
+
+    It shares the tables of the full checkpointer, so switching modes needs no migration. The graph
+    runs with `exit` durability in this mode, which writes one checkpoint per turn instead of one per
+    step, and every root checkpoint deletes the older checkpoints, writes and blobs of its thread,
+    including those of the agent subgraphs.
+    """
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = await super().aput(config, checkpoint, metadata, new_versions)
+
+        thread_id = next_config["configurable"]["thread_id"]
+        if next_config["configurable"]["checkpoint_ns"]:
+            return next_config
+
+        with metrics.span("checkpoint_prune", kind="shallow"):
+            async with self._cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM checkpoint_writes WHERE thread_id = %s AND (checkpoint_ns <> '' OR checkpoint_id <> %s)",
+                    (thread_id, checkpoint["id"]),
+                )
+                await cur.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = %s AND (checkpoint_ns <> '' OR checkpoint_id <> %s)",
+                    (thread_id, checkpoint["id"]),
+                )
+                await cur.execute(DELETE_THREAD_ORPHAN_BLOBS_SQL, (thread_id,))
+
+        return next_config
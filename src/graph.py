@@ -4,8 +4,12 @@ from langgraph.types import RetryPolicy
 
 from src.core.langfuse import LangfuseConfig
 from src.database import Database
+from src.core.config import app_config
+from src.modules.agents.answer_cache_agent import AnswerCacheAgent
+from src.modules.agents.prefetch_agent import PrefetchAgent
+from src.modules.agents.summary_agent import SummaryAgent
 from src.modules.agents.supervisor_agent import SupervisorAgent
-from src.modules.const.enum import AgentEnum
+from src.modules.const.enum import AgentEnum, AnswerCacheBackendEnum, GraphTopologyEnum, ToolEnum
 from src.modules.schemas.state_schema import Configuration, State
 
 
@@ -14,6 +18,9 @@ class AgentGraph:
     def __init__(self, db: Database, langfuse_config: LangfuseConfig):
         self._db = db
         self._supervisor = SupervisorAgent(langfuse_config)
+        self._summary = SummaryAgent(langfuse_config)
+        self._prefetch = PrefetchAgent(langfuse_config)
+        self._answer_cache = AnswerCacheAgent(langfuse_config)
 
     def builder(self) -> StateGraph[State, Configuration]:
         """Build the agent graph.
@@ -29,8 +36,49 @@ class AgentGraph:
             retry_policy=RetryPolicy(max_attempts=3),
         )
 
-        builder.add_edge(START, AgentEnum.SUPERVISOR.value)
-        builder.add_edge(AgentEnum.SUPERVISOR.value, END)
+        # trimming after the answer keeps it out of the time to the first streamed token
+        builder.add_node(
+            AgentEnum.SUMMARY.value,
+            self._summary.node,
+            retry_policy=RetryPolicy(max_attempts=3),
+        )
+
+        if app_config.graph_topology == GraphTopologyEnum.PREFETCH:
+            builder.add_node(AgentEnum.ROUTER.value, self._prefetch.router_node)
+            # the retrieval nodes retry on their own and report a failure as their result
+            builder.add_node(ToolEnum.FRAUD_RECORDS.value, self._prefetch.fraud_records_node)
+            builder.add_node(ToolEnum.PDF_CONTENTS.value, self._prefetch.pdf_contents_node)
+
+            # the selected tools run in the same step, the supervisor runs once both are done
+            builder.add_conditional_edges(
+                AgentEnum.ROUTER.value,
+                self._prefetch.route,
+                [ToolEnum.FRAUD_RECORDS.value, ToolEnum.PDF_CONTENTS.value, AgentEnum.SUPERVISOR.value],
+            )
+            builder.add_edge(ToolEnum.FRAUD_RECORDS.value, AgentEnum.SUPERVISOR.value)
+            builder.add_edge(ToolEnum.PDF_CONTENTS.value, AgentEnum.SUPERVISOR.value)
+            first_node = AgentEnum.ROUTER.value
+        else:
+            first_node = AgentEnum.SUPERVISOR.value
+
+        if app_config.answer_cache_backend != AnswerCacheBackendEnum.NONE:
+            builder.add_node(AgentEnum.ANSWER_CACHE.value, self._answer_cache.lookup_node)
+            builder.add_node(AgentEnum.ANSWER_CACHE_STORE.value, self._answer_cache.store_node)
+
+            # a hit ends the graph before any LLM call
+            builder.add_edge(START, AgentEnum.ANSWER_CACHE.value)
+            builder.add_conditional_edges(
+                AgentEnum.ANSWER_CACHE.value,
+                self._answer_cache.route,
+                [first_node, END],
+            )
+            builder.add_edge(AgentEnum.SUPERVISOR.value, AgentEnum.ANSWER_CACHE_STORE.value)
+            builder.add_edge(AgentEnum.ANSWER_CACHE_STORE.value, AgentEnum.SUMMARY.value)
+        else:
+            builder.add_edge(START, first_node)
+            builder.add_edge(AgentEnum.SUPERVISOR.value, AgentEnum.SUMMARY.value)
+
+        builder.add_edge(AgentEnum.SUMMARY.value, END)
 
         return builder
 
@@ -43,4 +91,4 @@ class AgentGraph:
         """
         builder = self.builder()
         
-        return builder.compile(checkpointer=self._db.get_postgres_checkpointer())
\ No newline at end of file
+        return builder.compile(checkpointer=self._db.get_checkpointer())
\ No newline at end of file
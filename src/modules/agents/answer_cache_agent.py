@@ -0,0 +1,115 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END
+
+from src.core.config import app_config
+from src.core.langfuse import LangfuseConfig
+from src.core.metrics import metrics
+from src.modules.const.enum import AgentEnum, GraphTopologyEnum
+from src.modules.schemas.state_schema import State
+from src.modules.services.answer_cache_service import answer_cache_service
+
+
+class AnswerCacheAgent:
+    """Answer repeated questions from the semantic answer cache, without any LLM call.
+
+    The lookup runs before the agents and ends the graph on a hit, the store runs after the
+    supervisor answered. Only the first turn of a thread is cached, since a later answer depends on
+    the conversation before it and not only on the question.
+    """
+
+    def __init__(self, langfuse_config: LangfuseConfig):
+        self._langfuse_config = langfuse_config
+
+    async def _aget_version(self) -> str | None:
+        """Get the cache version for the current data and answer prompts.
+
+        Returns:
+            str | None: The version, or None when nothing should be cached.
+        """
+        with metrics.span("prompt_fetch", prompt=AgentEnum.SUPERVISOR.value):
+            supervisor_prompt = self._langfuse_config._client.get_prompt(
+                AgentEnum.SUPERVISOR.value,
+                label="final",
+                cache_ttl_seconds=600,
+            )
+        with metrics.span("prompt_fetch", prompt="search_fraud_records"):
+            sql_prompt = self._langfuse_config._client.get_prompt(
+                "search_fraud_records",
+                label="latest",
+                cache_ttl_seconds=600,
+            )
+        return await answer_cache_service.aget_version([supervisor_prompt.version, sql_prompt.version])
+
+    def _is_first_turn(self, state: State, answered: bool) -> bool:
+        messages = state["messages"]
+        expected = 2 if answered else 1
+        return len(messages) == expected and not state.get("summary") and isinstance(messages[0], HumanMessage)
+
+    def route(self, state: State) -> str:
+        """End the graph on a cache hit, otherwise hand over to the agents.
+
+        Args:
+            state (State): The state of the graph.
+
+        Returns:
+            str: END on a hit, the first agent node on a miss.
+        """
+        if isinstance(state["messages"][-1], AIMessage):
+            return END
+        if app_config.graph_topology == GraphTopologyEnum.PREFETCH:
+            return AgentEnum.ROUTER.value
+        return AgentEnum.SUPERVISOR.value
+
+    async def lookup_node(self, state: State, config: RunnableConfig) -> State:
+        """Answer the first question of a thread from the cache.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The cached answer, or no update on a miss.
+        """
+        if not self._is_first_turn(state, answered=False):
+            return {}
+
+        try:
+            version = await self._aget_version()
+            if version is None:
+                return {}
+            answer = await answer_cache_service.alookup(state["messages"][0].content, version)
+        except Exception as e:
+            # the agents can still answer, only slower
+            print(f"Failed to look up the answer cache: {e}")
+            return {}
+
+        if answer is None:
+            return {}
+        return {"messages": [AIMessage(content=answer)]}
+
+    async def store_node(self, state: State, config: RunnableConfig) -> State:
+        """Store the answer to the first question of a thread.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: No update.
+        """
+        if not self._is_first_turn(state, answered=True):
+            return {}
+
+        answer = state["messages"][-1].content
+        if not isinstance(answer, str) or not answer:
+            return {}
+
+        try:
+            version = await self._aget_version()
+            if version is not None:
+                await answer_cache_service.astore(state["messages"][0].content, answer, version)
+        except Exception as e:
+            # the user already has the answer, a failed store only costs a later hit
+            print(f"Failed to store the answer in the answer cache: {e}")
+        return {}
@@ -0,0 +1,129 @@
+import asyncio
+
+from collections.abc import Awaitable, Callable
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import merge_configs
+
+from src.core.config import app_config
+from src.core.langfuse import LangfuseConfig
+from src.core.metrics import llm_timing_callback, metrics
+from src.modules.const.enum import AgentEnum, ToolEnum
+from src.modules.schemas.state_schema import State
+from src.modules.services.fraud_records_service import fraud_records_service
+from src.modules.services.retrieval_service import pdf_retrieval_service
+from src.modules.utils.supervisor_util import format_pdf_search_results
+
+
+# the same retries as the `ToolRetryMiddleware` of the supervisor agent in the agent topology
+PREFETCH_MAX_RETRIES = 3
+PREFETCH_RETRY_INITIAL_DELAY = 1.0
+
+
+class PrefetchAgent:
+    """Run the retrieval tools in parallel before the supervisor answers.
+
+    The router picks the tools of `prefetch_tools` without an LLM call, the graph fans out to one
+    node per tool, and their results are merged into the `retrieval_context` of the state. The
+    supervisor then answers from that context in a single LLM call, instead of one call to pick
+    each tool and another to answer.
+    """
+
+    def __init__(self, langfuse_config: LangfuseConfig):
+        self._langfuse_config = langfuse_config
+
+    def _get_query(self, state: State) -> str:
+        return next((message.content for message in reversed(state["messages"]) if isinstance(message, HumanMessage)), "")
+
+    async def _asearch(self, tool: ToolEnum, search: Callable[[], Awaitable[str]]) -> str:
+        """Run a retrieval, retrying failures with exponential backoff.
+
+        Once the retries are exhausted the failure is returned as the result, so the supervisor can
+        still answer from the other retrieval, as a failed tool call does in the agent topology.
+
+        Args:
+            tool (ToolEnum): The retrieval tool.
+            search (Callable[[], Awaitable[str]]): Runs the retrieval and returns its formatted result.
+
+        Returns:
+            str: The result, or the reason the retrieval failed.
+        """
+        delay = PREFETCH_RETRY_INITIAL_DELAY
+        for attempt in range(PREFETCH_MAX_RETRIES + 1):
+            try:
+                with metrics.span("tool", tool=tool.value):
+                    return await search()
+            except Exception as e:
+                if attempt == PREFETCH_MAX_RETRIES:
+                    return f"Failed to run {tool.value}: {str(e)}"
+                print(f"{tool.value} failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    def route(self, state: State) -> list[str]:
+        """Pick the prefetch nodes to run for the last user message.
+
+        Args:
+            state (State): The state of the graph.
+
+        Returns:
+            list[str]: The prefetch nodes, or the supervisor when no tool is enabled.
+        """
+        tools = [tool.value for tool in ToolEnum if tool.value in app_config.prefetch_tools]
+        return tools or [AgentEnum.SUPERVISOR.value]
+
+    async def router_node(self, state: State, config: RunnableConfig) -> State:
+        """Clear the retrieval results of the previous turn.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The cleared retrieval context.
+        """
+        return {"retrieval_context": None}
+
+    async def fraud_records_node(self, state: State, config: RunnableConfig) -> State:
+        """Search the fraud records for the last user message.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The search result under the tool name.
+        """
+        async def search(query: str) -> str:
+            return await fraud_records_service.asearch(query, self._langfuse_config._client)
+
+        # run as a child runnable, so the SQL generation call is traced like in the tool
+        merged_configs = merge_configs(
+            config,
+            {"callbacks": [self._langfuse_config._callback, llm_timing_callback]},
+        )
+
+        result = await self._asearch(
+            ToolEnum.FRAUD_RECORDS,
+            lambda: RunnableLambda(search, name="fraud_records_prefetch").ainvoke(self._get_query(state), merged_configs),
+        )
+
+        return {"retrieval_context": {ToolEnum.FRAUD_RECORDS.value: result}}
+
+    async def pdf_contents_node(self, state: State, config: RunnableConfig) -> State:
+        """Search the PDF contents for the last user message.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The search result under the tool name.
+        """
+        async def search() -> str:
+            return format_pdf_search_results(await pdf_retrieval_service.asearch(self._get_query(state), k=3))
+
+        result = await self._asearch(ToolEnum.PDF_CONTENTS, search)
+
+        return {"retrieval_context": {ToolEnum.PDF_CONTENTS.value: result}}
@@ -0,0 +1,114 @@
+from langchain_core.messages import AnyMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+
+from src.core.config import app_config
+from src.core.langfuse import LangfuseConfig
+from src.core.llm import llm_registry
+from src.core.metrics import llm_timing_callback, metrics
+from src.modules.const.enum import AgentEnum
+from src.modules.schemas.state_schema import State
+from src.modules.utils.supervisor_util import format_conversation_history
+
+
+# used until a `conversation_summary` prompt is created in Langfuse
+DEFAULT_SUMMARY_PROMPT = (
+    "Update the summary of a conversation between a user and a fraud analysis assistant with the new messages. "
+    "Keep the facts, numbers, filters and open questions the assistant may need later, and drop small talk. "
+    "Return only the updated summary.\n\n"
+    "Current summary:\n{{summary}}\n\n"
+    "New messages:\n{{conversation}}"
+)
+
+
+class SummaryAgent:
+    """Keep the thread history bounded with a sliding window and a rolling summary.
+
+    Once a thread holds more than `history_max_messages` messages, everything but the last
+    `history_window_messages` is folded into the `summary` of the state and removed from it. Only
+    the evicted messages are sent with the previous summary, so every update costs about the same
+    however long the thread is, and it runs once every few turns rather than on each of them.
+    """
+
+    def __init__(self, langfuse_config: LangfuseConfig):
+        self._langfuse_config = langfuse_config
+
+    async def _asummarize(self, summary: str, messages: list[AnyMessage], config: RunnableConfig) -> str:
+        """Fold messages into the summary.
+
+        Args:
+            summary (str): The current summary, empty on the first update.
+            messages (list[AnyMessage]): The messages leaving the window.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            str: The updated summary, at most `history_summary_max_chars` long.
+        """
+        with metrics.span("prompt_fetch", prompt=AgentEnum.SUMMARY.value):
+            prompt = self._langfuse_config._client.get_prompt(
+                AgentEnum.SUMMARY.value,
+                label="final",
+                cache_ttl_seconds=600,
+                fallback=DEFAULT_SUMMARY_PROMPT,
+            )
+            if not prompt.config.get("model"):
+                # the fallback prompt has no config, so it runs on the supervisor model
+                model_prompt = self._langfuse_config._client.get_prompt(
+                    AgentEnum.SUPERVISOR.value,
+                    label="final",
+                    cache_ttl_seconds=600,
+                )
+            else:
+                model_prompt = prompt
+
+        compiled_prompt = prompt.compile(
+            summary=summary or "No summary yet.",
+            conversation=format_conversation_history(messages),
+        )
+
+        merged_configs = merge_configs(
+            config,
+            {"callbacks": [self._langfuse_config._callback, llm_timing_callback]},
+        )
+
+        with metrics.span("history_summary"):
+            response = await llm_registry.get_prompt_llm(model_prompt).ainvoke(compiled_prompt, merged_configs)
+
+        return response.content.strip()[:app_config.history_summary_max_chars]
+
+    async def arun(self, state: State, config: RunnableConfig) -> State:
+        """Asynchronous trim the thread history, summarizing the evicted messages.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The removed messages and the updated summary, or no update while the history is short.
+        """
+        messages = state["messages"]
+        window = max(app_config.history_window_messages, 1)
+        if len(messages) <= max(app_config.history_max_messages, window):
+            return {}
+
+        evicted = messages[:-window]
+        summary = state.get("summary", "")
+        if app_config.history_summary_enabled:
+            summary = await self._asummarize(summary, evicted, config)
+
+        return {
+            "messages": [RemoveMessage(id=message.id) for message in evicted],
+            "summary": summary,
+        }
+
+    async def node(self, state: State, config: RunnableConfig) -> State:
+        """Run the summary agent.
+
+        Args:
+            state (State): The state of the graph.
+            config (RunnableConfig): The configuration of the graph.
+
+        Returns:
+            State: The updated state of the graph.
+        """
+        return await self.arun(state, config)
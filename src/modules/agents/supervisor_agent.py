@@ -1,19 +1,21 @@
-from pydantic import SecretStr
-
 from langchain.agents import create_agent
 from langchain.agents.middleware import ToolRetryMiddleware
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.config import merge_configs
-from langchain_openai import ChatOpenAI
+from langfuse.model import PromptClient
+from langgraph.graph.state import CompiledStateGraph
 
-from src.core.config import app_config 
+from src.core.config import app_config
 from src.core.langfuse import LangfuseConfig
-from src.modules.const.enum import AgentEnum
+from src.core.llm import llm_registry
+from src.core.metrics import llm_timing_callback, metrics
+from src.modules.const.enum import AgentEnum, GraphTopologyEnum
 from src.modules.schemas.state_schema import State
 from src.modules.tools.pdf_tool import search_pdf_contents
 from src.modules.tools.tabular_data_tool import search_fraud_records
-from src.modules.utils.supervisor_util import format_conversation_history
+from src.modules.utils.supervisor_util import format_conversation_history, format_retrieval_context
 
 
 class SupervisorAgent:
@@ -21,6 +23,36 @@ class SupervisorAgent:
     def __init__(self, langfuse_config: LangfuseConfig):
         self._langfuse_config = langfuse_config
 
+    def _build_agent(self, llm: BaseChatModel) -> CompiledStateGraph:
+        """Build the supervisor agent around a chat model.
+
+        Args:
+            llm (BaseChatModel): The chat model.
+
+        Returns:
+            CompiledStateGraph: The compiled agent.
+        """
+        tools = [search_fraud_records, search_pdf_contents]
+        with metrics.span("agent_build", agent=AgentEnum.SUPERVISOR.value):
+            return create_agent(
+                model=llm,
+                tools=tools,
+                middleware=[
+                    ToolRetryMiddleware(
+                        max_retries=3,
+                        initial_delay=1.0,
+                    )
+                ]
+            )
+
+    def _get_prompt(self) -> PromptClient:
+        with metrics.span("prompt_fetch", prompt=AgentEnum.SUPERVISOR.value):
+            return self._langfuse_config._client.get_prompt(
+                AgentEnum.SUPERVISOR.value,
+                label="final",
+                cache_ttl_seconds=600,
+            )
+
     async def _ainvoke_agent(
         self,
         conversation_history: str,
@@ -35,46 +67,51 @@ class SupervisorAgent:
         Returns:
             dict: The response from the agent.
         """
-        prompt = self._langfuse_config._client.get_prompt(
-            AgentEnum.SUPERVISOR.value,
-            label="final",
-            cache_ttl_seconds=600,
-        )
+        prompt = self._get_prompt()
         compiled_prompt = prompt.compile(
             conversation_history=conversation_history,
         )
 
-        model = prompt.config.get("model")
-        temperature = prompt.config.get("temperature", 0.0)
+        agent = llm_registry.get_agent(AgentEnum.SUPERVISOR.value, prompt, self._build_agent)
 
-        llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=SecretStr(app_config.openrouter_api_key),
-            base_url="https://openrouter.ai/api/v1",
+        merged_configs = merge_configs(
+            config,
+            {
+                "callbacks": [self._langfuse_config._callback, llm_timing_callback],
+                "langfuse_client": self._langfuse_config._client,
+            },
         )
 
-        tools = [search_fraud_records, search_pdf_contents]
-        agent = create_agent(
-            model=llm,
-            tools=tools,
-            middleware=[
-                ToolRetryMiddleware(
-                    max_retries=3,
-                    initial_delay=1.0,
-                )
-            ]
+        with metrics.span("agent_run", agent=AgentEnum.SUPERVISOR.value):
+            return await agent.ainvoke({"messages": compiled_prompt}, merged_configs)
+
+    async def _ainvoke_llm(
+        self,
+        conversation_history: str,
+        config: RunnableConfig,
+    ) -> str:
+        """Asynchronous answer from the prefetched context in a single LLM call, without tools.
+
+        Args:
+            conversation_history (str): The conversation history, ending with the retrieved context.
+            config (RunnableConfig): The configuration of the agent.
+
+        Returns:
+            str: The answer.
+        """
+        prompt = self._get_prompt()
+        compiled_prompt = prompt.compile(
+            conversation_history=conversation_history,
         )
 
         merged_configs = merge_configs(
             config,
-            {
-                "callbacks": [self._langfuse_config._callback],
-                "langfuse_client": self._langfuse_config._client,
-            },
+            {"callbacks": [self._langfuse_config._callback, llm_timing_callback]},
         )
 
-        return await agent.ainvoke({"messages": compiled_prompt}, merged_configs)
+        with metrics.span("agent_run", agent=AgentEnum.SUPERVISOR.value):
+            response = await llm_registry.get_prompt_llm(prompt).ainvoke(compiled_prompt, merged_configs)
+        return response.content
 
     async def arun(self, state: State, config: RunnableConfig) -> State:
         """Asynchronous run the supervisor agent.
@@ -86,7 +123,17 @@ class SupervisorAgent:
         Returns:
             State: The updated state of the agent.
         """
-        conversation_history = format_conversation_history(state["messages"])
+        conversation_history = format_conversation_history(state["messages"], state.get("summary", ""))
+
+        if app_config.graph_topology == GraphTopologyEnum.PREFETCH:
+            retrieval_context = format_retrieval_context(state.get("retrieval_context", {}))
+            content = await self._ainvoke_llm(
+                conversation_history=f"{conversation_history}\n{retrieval_context}" if retrieval_context else conversation_history,
+                config=config,
+            )
+            return {
+                "messages": [AIMessage(content=content)],
+            }
 
         response = await self._ainvoke_agent(
             conversation_history=conversation_history,
@@ -3,3 +3,79 @@ from enum import Enum
 
 class AgentEnum(Enum):
     SUPERVISOR = "supervisor_agent"
+    SUMMARY = "conversation_summary"
+    ROUTER = "retrieval_router"
+    ANSWER_CACHE = "answer_cache"
+    ANSWER_CACHE_STORE = "answer_cache_store"
+
+
+class ToolEnum(Enum):
+    FRAUD_RECORDS = "search_fraud_records"
+    PDF_CONTENTS = "search_pdf_contents"
+
+
+class GraphTopologyEnum(Enum):
+    AGENT = "agent"
+    PREFETCH = "prefetch"
+
+
+class LoadMethodEnum(Enum):
+    COPY = "copy"
+    EXECUTEMANY = "executemany"
+
+
+class CopyFormatEnum(Enum):
+    TEXT = "text"
+    BINARY = "binary"
+
+
+class EmbeddingBackendEnum(Enum):
+    OPENROUTER = "openrouter"
+    FAKE = "fake"
+
+
+class LlmBackendEnum(Enum):
+    OPENROUTER = "openrouter"
+    FAKE = "fake"
+
+
+class PromptBackendEnum(Enum):
+    LANGFUSE = "langfuse"
+    LOCAL = "local"
+
+
+class VectorIndexEnum(Enum):
+    NONE = "none"
+    HNSW = "hnsw"
+    IVFFLAT = "ivfflat"
+
+
+class QueryBackendEnum(Enum):
+    POSTGRES = "postgres"
+    DUCKDB = "duckdb"
+
+
+class StreamEventEnum(Enum):
+    TOOL_START = "tool_start"
+    TOOL_END = "tool_end"
+    TOKEN = "token"
+    FINAL = "final"
+
+
+class CheckpointModeEnum(Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    SHALLOW = "shallow"
+    POSTGRES = "postgres"
+
+
+class CheckpointDurabilityEnum(Enum):
+    SYNC = "sync"
+    ASYNC = "async"
+    EXIT = "exit"
+
+
+class AnswerCacheBackendEnum(Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    POSTGRES = "postgres"
@@ -1,15 +1,39 @@
 import os
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Any, TypedDict
+from typing import Annotated, Any, NotRequired, TypedDict
 
 from langchain_core.messages import AnyMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph.message import add_messages
 
+from src.modules.const.enum import StreamEventEnum
+
+
+def merge_retrieval_context(current: dict[str, str] | None, update: dict[str, str] | None) -> dict[str, str]:
+    """Merge the results of the parallel prefetch nodes, a None update clears them for a new turn.
+
+    Args:
+        current (dict[str, str] | None): The results so far, by tool name.
+        update (dict[str, str] | None): The results of one node, or None to clear.
+
+    Returns:
+        dict[str, str]: The merged results.
+    """
+    if update is None:
+        return {}
+    return {**(current or {}), **update}
+
 
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
+    summary: NotRequired[str]
+    retrieval_context: NotRequired[Annotated[dict[str, str], merge_retrieval_context]]
+
+
+class StreamEvent(TypedDict):
+    type: StreamEventEnum
+    content: str
 
 
 @dataclass(kw_only=True)
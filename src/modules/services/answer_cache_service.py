@@ -0,0 +1,258 @@
+import time
+
+import numpy as np
+
+from src.core.config import app_config
+from src.core.metrics import metrics
+from src.database import Database
+from src.modules.const.enum import AnswerCacheBackendEnum
+from src.modules.services.manifest_service import ManifestService, text_sha256
+from src.modules.services.retrieval_service import pdf_retrieval_service
+from src.modules.services.vector_index_service import MAX_HALFVEC_INDEX_DIMENSION, get_vector_type, is_indexable
+
+
+# the nearest entry of the current version, filtered before the TTL so expired rows never match
+LOOKUP_ANSWER_SQL = """
+    SELECT answer, 1 - (embedding <=> %(embedding)s::{vector_type}) AS similarity
+    FROM {table}
+    WHERE version = %(version)s
+    AND (%(ttl_seconds)s = 0 OR created_at > now() - make_interval(secs => %(ttl_seconds)s))
+    ORDER BY embedding <=> %(embedding)s::{vector_type}
+    LIMIT 1
+"""
+
+# drops the expired entries and the oldest beyond the maximum size; entries of other versions are
+# left alone, since processes that haven't seen a new data or prompt version yet still use them,
+# and the version filter of the lookup already ignores them until they age out
+TRIM_ANSWERS_SQL = """
+    DELETE FROM {table}
+    WHERE (%(ttl_seconds)s > 0 AND created_at < now() - make_interval(secs => %(ttl_seconds)s))
+    OR id <= (SELECT MAX(id) FROM {table}) - %(max_entries)s
+"""
+
+
+def format_vector(vector: np.ndarray) -> str:
+    return "[" + ",".join(str(float(value)) for value in vector) + "]"
+
+
+class AnswerCacheService:
+    """Semantic cache of complete chat answers.
+
+    A question is embedded and matched against the questions answered before, and the stored answer
+    is reused when the cosine similarity reaches `answer_cache_similarity_threshold`. Entries are
+    tagged with a version built from the ingested data, the answer prompts and the graph topology,
+    so re-ingesting a file or publishing a new prompt invalidates every answer given before.
+
+    The `memory` backend keeps the normalized vectors in a fixed-size numpy array of the process and
+    searches it exactly. The `postgres` backend keeps them in a pgvector table shared by every
+    process, with an HNSW index when the embedding dimension allows it.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._manifest = ManifestService(db)
+        self._data_versions: tuple[str | None, ...] = ()
+        self._data_versions_checked_at = 0.0
+        self._vectors: np.ndarray | None = None
+        self._entries: list[tuple[float, str] | None] = []
+        self._next_slot = 0
+        self._memory_version: str | None = None
+
+    async def setup(self) -> None:
+        """Create the cache table and its indexes if the Postgres backend is enabled.
+        """
+        if app_config.answer_cache_backend != AnswerCacheBackendEnum.POSTGRES:
+            return
+
+        table = app_config.answer_cache_table_name
+        vector_type = get_vector_type(app_config.embedding_dimension)
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            await cursor.execute(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'embedding'",
+                (table,),
+            )
+            row = await cursor.fetchone()
+            if row and row[0] != vector_type:
+                # the entries of another embedding dimension can never match again
+                await cursor.execute(f"DROP TABLE {table}")
+            await cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id BIGSERIAL PRIMARY KEY,
+                    version VARCHAR(16) NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    embedding {vector_type} NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+            await cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_version_idx ON {table} (version, created_at)")
+            if is_indexable(app_config.embedding_dimension):
+                ops = vector_type.split("(")[0] + "_cosine_ops"
+                await cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_embedding_idx ON {table} USING hnsw (embedding {ops})"
+                )
+            else:
+                print(
+                    f"Answer cache lookups are exact: pgvector cannot index {app_config.embedding_dimension}-dimensional "
+                    f"vectors (max {MAX_HALFVEC_INDEX_DIMENSION})."
+                )
+            await db_conn.commit()
+
+    async def _arefresh_data_versions(self) -> tuple[str | None, ...]:
+        """Get the versions of the tabular and PDF data.
+
+        The versions are read at most once every `answer_cache_version_check_seconds`.
+
+        Returns:
+            tuple[str | None, ...]: The versions, None for a source that was never ingested.
+        """
+        now = time.monotonic()
+        if now - self._data_versions_checked_at < app_config.answer_cache_version_check_seconds:
+            return self._data_versions
+        self._data_versions_checked_at = now
+
+        try:
+            self._data_versions = (
+                await self._manifest.aget_version(app_config.tabular_table_name),
+                await self._manifest.aget_version(app_config.pdf_vector_table_name),
+            )
+        except Exception as e:
+            print(f"Failed to read the data versions, the answer cache is bypassed: {e}")
+            self._data_versions = (None, None)
+        return self._data_versions
+
+    async def aget_version(self, prompt_versions: list[int | str]) -> str | None:
+        """Get the version the cached answers are tagged with.
+
+        Args:
+            prompt_versions (list[int | str]): Versions of the prompts the answers are generated with.
+
+        Returns:
+            str | None: The version, or None when the data versions are unknown and nothing should be cached.
+        """
+        data_versions = await self._arefresh_data_versions()
+        if any(version is None for version in data_versions):
+            return None
+
+        parts = [*data_versions, *prompt_versions, app_config.graph_topology.value, app_config.embedding_model]
+        return text_sha256(":".join(str(part) for part in parts))[:16]
+
+    def _reset_memory(self, version: str) -> None:
+        size = max(app_config.answer_cache_max_entries, 1)
+        self._vectors = np.zeros((size, app_config.embedding_dimension), dtype=np.float32)
+        self._entries = [None] * size
+        self._next_slot = 0
+        self._memory_version = version
+
+    def _lookup_memory(self, vector: np.ndarray, version: str) -> str | None:
+        if self._vectors is None or self._memory_version != version:
+            return None
+
+        scores = self._vectors @ vector
+        now = time.monotonic()
+        while True:
+            slot = int(np.argmax(scores))
+            entry = self._entries[slot]
+            if entry is None or scores[slot] < app_config.answer_cache_similarity_threshold:
+                return None
+
+            created_at, answer = entry
+            if not app_config.answer_cache_ttl_seconds or now - created_at <= app_config.answer_cache_ttl_seconds:
+                return answer
+
+            # a zero vector never reaches the threshold again
+            self._vectors[slot] = 0
+            self._entries[slot] = None
+            scores[slot] = -np.inf
+
+    def _store_memory(self, vector: np.ndarray, answer: str, version: str) -> None:
+        if self._vectors is None or self._memory_version != version:
+            self._reset_memory(version)
+
+        # a ring buffer, so the oldest entry is overwritten once the cache is full
+        slot = self._next_slot % len(self._entries)
+        self._vectors[slot] = vector
+        self._entries[slot] = (time.monotonic(), answer)
+        self._next_slot += 1
+
+    async def _alookup_postgres(self, vector: np.ndarray, version: str) -> str | None:
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                LOOKUP_ANSWER_SQL.format(
+                    table=app_config.answer_cache_table_name,
+                    vector_type=get_vector_type(app_config.embedding_dimension),
+                ),
+                {
+                    "embedding": format_vector(vector),
+                    "version": version,
+                    "ttl_seconds": app_config.answer_cache_ttl_seconds,
+                },
+            )
+            row = await cursor.fetchone()
+
+        if row is None or row[1] < app_config.answer_cache_similarity_threshold:
+            return None
+        return row[0]
+
+    async def _astore_postgres(self, question: str, vector: np.ndarray, answer: str, version: str) -> None:
+        table = app_config.answer_cache_table_name
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"INSERT INTO {table} (version, question, answer, embedding) VALUES (%s, %s, %s, %s::{get_vector_type(app_config.embedding_dimension)})",
+                (version, question, answer, format_vector(vector)),
+            )
+            await cursor.execute(
+                TRIM_ANSWERS_SQL.format(table=table),
+                {
+                    "ttl_seconds": app_config.answer_cache_ttl_seconds,
+                    "max_entries": max(app_config.answer_cache_max_entries, 1),
+                },
+            )
+            await db_conn.commit()
+
+    async def _aembed(self, question: str) -> np.ndarray:
+        vector = np.asarray(await pdf_retrieval_service.aembed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def alookup(self, question: str, version: str) -> str | None:
+        """Get the answer to the most similar question answered before.
+
+        Args:
+            question (str): The user's question.
+            version (str): The current cache version.
+
+        Returns:
+            str | None: The cached answer, or None on a miss.
+        """
+        with metrics.span("answer_cache_lookup", backend=app_config.answer_cache_backend.value):
+            vector = await self._aembed(question)
+            if app_config.answer_cache_backend == AnswerCacheBackendEnum.POSTGRES:
+                answer = await self._alookup_postgres(vector, version)
+            else:
+                answer = self._lookup_memory(vector, version)
+
+        metrics.increment("answer_cache_lookups_total", result="miss" if answer is None else "hit")
+        return answer
+
+    async def astore(self, question: str, answer: str, version: str) -> None:
+        """Store the answer to a question.
+
+        Args:
+            question (str): The user's question.
+            answer (str): The answer.
+            version (str): The cache version the answer was generated under.
+        """
+        with metrics.span("answer_cache_store", backend=app_config.answer_cache_backend.value):
+            # the embedding was cached by the lookup of the same question
+            vector = await self._aembed(question)
+            if app_config.answer_cache_backend == AnswerCacheBackendEnum.POSTGRES:
+                await self._astore_postgres(question, vector, answer, version)
+            else:
+                self._store_memory(vector, answer, version)
+
+
+answer_cache_service = AnswerCacheService(Database())
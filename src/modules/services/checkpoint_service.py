@@ -0,0 +1,203 @@
+from src.core.config import app_config
+from src.core.metrics import metrics
+from src.database import Database
+
+
+CHECKPOINT_TABLES = ["checkpoints", "checkpoint_writes", "checkpoint_blobs"]
+
+# the expired and orphaned keys are collected once into temporary tables of the pruning session,
+# numbered so every batch deletes an id range instead of scanning the checkpoint tables again
+CREATE_EXPIRED_CHECKPOINTS_SQL = """
+    CREATE TEMPORARY TABLE prune_expired_checkpoints (
+        id BIGSERIAL PRIMARY KEY,
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        checkpoint_id TEXT NOT NULL
+    )
+"""
+
+# checkpoint ids are time-ordered (uuid6), so the newest checkpoints of a namespace rank first
+COLLECT_EXPIRED_CHECKPOINTS_SQL = """
+    INSERT INTO prune_expired_checkpoints (thread_id, checkpoint_ns, checkpoint_id)
+    SELECT thread_id, checkpoint_ns, checkpoint_id
+    FROM (
+        SELECT
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            (checkpoint ->> 'ts')::timestamptz AS created_at,
+            row_number() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position
+        FROM checkpoints
+    ) ranked
+    WHERE (%(ttl_seconds)s > 0 AND created_at < now() - make_interval(secs => %(ttl_seconds)s))
+    OR (%(keep_per_thread)s > 0 AND position > %(keep_per_thread)s)
+"""
+
+DELETE_EXPIRED_CHECKPOINTS_SQL = """
+    WITH expired AS (
+        SELECT thread_id, checkpoint_ns, checkpoint_id
+        FROM prune_expired_checkpoints
+        WHERE id > %(first_id)s AND id <= %(last_id)s
+    ),
+    deleted AS (
+        DELETE FROM checkpoints c
+        USING expired e
+        WHERE c.thread_id = e.thread_id AND c.checkpoint_ns = e.checkpoint_ns AND c.checkpoint_id = e.checkpoint_id
+        RETURNING 1
+    ),
+    deleted_writes AS (
+        DELETE FROM checkpoint_writes w
+        USING expired e
+        WHERE w.thread_id = e.thread_id AND w.checkpoint_ns = e.checkpoint_ns AND w.checkpoint_id = e.checkpoint_id
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM deleted), (SELECT COUNT(*) FROM deleted_writes)
+"""
+
+CREATE_ORPHAN_BLOBS_SQL = """
+    CREATE TEMPORARY TABLE prune_orphan_blobs (
+        id BIGSERIAL PRIMARY KEY,
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL
+    )
+"""
+
+# blobs hold the non-primitive channel values, keyed by channel version; a blob is garbage once no
+# checkpoint of its thread and namespace points to its version anymore
+COLLECT_ORPHAN_BLOBS_SQL = """
+    INSERT INTO prune_orphan_blobs (thread_id, checkpoint_ns, channel, version)
+    SELECT b.thread_id, b.checkpoint_ns, b.channel, b.version
+    FROM checkpoint_blobs b
+    WHERE NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id
+        AND c.checkpoint_ns = b.checkpoint_ns
+        AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+    )
+"""
+
+# checked again per batch, a checkpoint written since the collection may point to the blob
+DELETE_ORPHAN_BLOBS_SQL = """
+    DELETE FROM checkpoint_blobs b
+    USING prune_orphan_blobs o
+    WHERE o.id > %(first_id)s AND o.id <= %(last_id)s
+    AND b.thread_id = o.thread_id
+    AND b.checkpoint_ns = o.checkpoint_ns
+    AND b.channel = o.channel
+    AND b.version = o.version
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id
+        AND c.checkpoint_ns = b.checkpoint_ns
+        AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+    )
+"""
+
+
+class CheckpointService:
+    """Retention and size reporting of the Postgres checkpoint tables.
+
+    Checkpoints older than `checkpoint_ttl_seconds` or beyond the newest `checkpoint_keep_per_thread`
+    of a thread are deleted with their writes, then the blobs no checkpoint points to anymore. The
+    keys to delete are collected with a single scan, then deleted in batches that each run in their
+    own short transaction, so pruning never holds long locks on the tables the chat turns write to.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+
+    async def atable_stats(self) -> dict[str, dict[str, int]]:
+        """Get the estimated row count and total size of the checkpoint tables.
+
+        Returns:
+            dict[str, dict[str, int]]: `{"rows": ..., "bytes": ...}` per existing table.
+        """
+        async with self._db.get_postgres_db() as conn, conn.cursor() as cursor:
+            await cursor.execute(
+                """
+                SELECT relname, GREATEST(reltuples, 0)::bigint, pg_total_relation_size(oid)
+                FROM pg_class
+                WHERE relname = ANY(%s) AND relkind = 'r' AND relnamespace = 'public'::regnamespace
+                """,
+                (CHECKPOINT_TABLES,),
+            )
+            rows = await cursor.fetchall()
+
+        stats = {table: {"rows": row_count, "bytes": size} for table, row_count, size in rows}
+        for table, values in stats.items():
+            metrics.set("checkpoint_table_rows", values["rows"], table=table)
+            metrics.set("checkpoint_table_bytes", values["bytes"], table=table)
+        return stats
+
+    async def aprune(
+        self,
+        ttl_seconds: int | None = None,
+        keep_per_thread: int | None = None,
+        batch_size: int | None = None,
+    ) -> dict[str, int]:
+        """Delete expired checkpoints, their writes and the orphaned blobs in bounded batches.
+
+        Args:
+            ttl_seconds (int | None, optional): Maximum checkpoint age, 0 keeps any age. Defaults to `checkpoint_ttl_seconds`.
+            keep_per_thread (int | None, optional): Newest checkpoints kept per thread and namespace, 0 keeps all. Defaults to `checkpoint_keep_per_thread`.
+            batch_size (int | None, optional): Rows deleted per transaction. Defaults to `checkpoint_prune_batch_size`.
+
+        Returns:
+            dict[str, int]: The number of deleted checkpoints, writes and blobs.
+        """
+        params = {
+            "ttl_seconds": app_config.checkpoint_ttl_seconds if ttl_seconds is None else ttl_seconds,
+            "keep_per_thread": app_config.checkpoint_keep_per_thread if keep_per_thread is None else keep_per_thread,
+            "batch_size": max(batch_size or app_config.checkpoint_prune_batch_size, 1),
+        }
+        deleted = {"checkpoints": 0, "writes": 0, "blobs": 0}
+
+        with metrics.span("checkpoint_prune", kind="retention"):
+            # one session, since the collected keys live in its temporary tables
+            async with self._db.get_postgres_db() as conn, conn.cursor() as cursor:
+                try:
+                    if params["ttl_seconds"] > 0 or params["keep_per_thread"] > 0:
+                        await cursor.execute(CREATE_EXPIRED_CHECKPOINTS_SQL)
+                        await cursor.execute(COLLECT_EXPIRED_CHECKPOINTS_SQL, params)
+                        expired = cursor.rowcount
+                        await conn.commit()
+
+                        for first_id in range(0, expired, params["batch_size"]):
+                            await cursor.execute(
+                                DELETE_EXPIRED_CHECKPOINTS_SQL,
+                                {"first_id": first_id, "last_id": first_id + params["batch_size"]},
+                            )
+                            checkpoints, writes = await cursor.fetchone()
+                            await conn.commit()
+                            deleted["checkpoints"] += checkpoints
+                            deleted["writes"] += writes
+
+                    await cursor.execute(CREATE_ORPHAN_BLOBS_SQL)
+                    await cursor.execute(COLLECT_ORPHAN_BLOBS_SQL)
+                    orphans = cursor.rowcount
+                    await conn.commit()
+
+                    for first_id in range(0, orphans, params["batch_size"]):
+                        await cursor.execute(
+                            DELETE_ORPHAN_BLOBS_SQL,
+                            {"first_id": first_id, "last_id": first_id + params["batch_size"]},
+                        )
+                        deleted["blobs"] += cursor.rowcount
+                        await conn.commit()
+                finally:
+                    # the connection goes back to the pool, so the keys must not outlive the job
+                    await conn.rollback()
+                    await conn.execute("DROP TABLE IF EXISTS prune_expired_checkpoints, prune_orphan_blobs")
+                    await conn.commit()
+
+            if any(deleted.values()):
+                # refreshes the row estimates of the stats, the freed space is reused after autovacuum
+                async with self._db.get_postgres_db() as conn:
+                    await conn.execute(f"ANALYZE {', '.join(CHECKPOINT_TABLES)}")
+                    await conn.commit()
+
+        for kind, count in deleted.items():
+            metrics.increment("checkpoint_pruned_total", count, kind=kind)
+        return deleted
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+from collections.abc import Callable
+from types import ModuleType
+
+from src.core.config import app_config
+from src.modules.services.tabular_data_service import (
+    ROLLUP_DIMENSIONS,
+    get_parquet_dir,
+    get_rollup_description,
+    get_rollup_query,
+    get_rollup_table_names,
+)
+
+
+def import_duckdb() -> ModuleType:
+    """Import DuckDB, which is an optional dependency.
+
+    Returns:
+        ModuleType: The duckdb module.
+    """
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The duckdb query backend needs the duckdb extra: `uv sync --extra duckdb`.") from e
+    return duckdb
+
+
+class DuckDbService:
+    """Run generated SQL on an in-process DuckDB copy of the tabular table.
+
+    The Parquet parts written during ingestion are loaded into an in-memory database together with
+    the rollups, after which file access is disabled, so queries can only read the loaded tables.
+    The database is reloaded when the Parquet parts change.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def get_signature(self) -> tuple:
+        """Get the name, modification time and size of every Parquet part, which change on ingestion.
+
+        Returns:
+            tuple: The signature of the Parquet parts.
+        """
+        parts = get_parquet_dir().glob("*.parquet")
+        return tuple(sorted((part.name, part.stat().st_mtime_ns, part.stat().st_size) for part in parts))
+
+    def _load(self):
+        """Load the Parquet parts and build the rollups in a new in-memory database.
+
+        Returns:
+            duckdb.DuckDBPyConnection: The locked down connection.
+        """
+        duckdb = import_duckdb()
+        table = app_config.tabular_table_name
+        parquet_glob = (get_parquet_dir() / "*.parquet").as_posix()
+
+        conn = duckdb.connect(":memory:")
+        if app_config.duckdb_threads > 0:
+            conn.execute(f"SET threads = {app_config.duckdb_threads}")
+        conn.execute(f"CREATE TABLE {table} AS SELECT * FROM read_parquet('{parquet_glob}')")
+        for dimension, rollup in zip(ROLLUP_DIMENSIONS, get_rollup_table_names()):
+            conn.execute(f"CREATE TABLE {rollup} AS {get_rollup_query(dimension)}")
+            conn.execute(f"COMMENT ON TABLE {rollup} IS '{get_rollup_description(dimension)}'")
+
+        conn.execute("SET enable_external_access = false")
+        conn.execute("SET lock_configuration = true")
+        return conn
+
+    def _get_conn(self):
+        """Get the connection, (re)loading the database when the Parquet parts changed.
+
+        Returns:
+            duckdb.DuckDBPyConnection: The connection.
+        """
+        with self._lock:
+            signature = self.get_signature()
+            if not signature:
+                raise FileNotFoundError(f"No Parquet parts in {get_parquet_dir()}, run pre_processing.py first.")
+            if signature != self._signature:
+                self._conn = self._load()
+                self._signature = signature
+                print(f"Loaded {len(signature)} Parquet parts into DuckDB.")
+            return self._conn
+
+    def describe(self, tables: list[str]) -> list[tuple]:
+        """Describe the columns of tables.
+
+        Args:
+            tables (list[str]): The table names.
+
+        Returns:
+            list[tuple]: (table, column, data type, table description) rows in table order.
+        """
+        with self._get_conn().cursor() as cursor:
+            return cursor.execute(
+                """
+                SELECT c.table_name, c.column_name, c.data_type, t.comment
+                FROM information_schema.columns c
+                JOIN duckdb_tables() t ON t.table_name = c.table_name
+                WHERE list_contains($tables, c.table_name)
+                ORDER BY list_position($tables, c.table_name), c.ordinal_position
+                """,
+                {"tables": tables},
+            ).fetchall()
+
+    def _execute(self, cursor, sql_query: str, on_batch: Callable[[list[tuple]], bool]) -> list[str]:
+        cursor.execute(f"SELECT * FROM ({sql_query}) AS governed_query LIMIT {app_config.sql_result_max_rows + 1}")
+        columns = [column[0] for column in cursor.description or []]
+        while batch := cursor.fetchmany(max(app_config.sql_result_fetch_size, 1)):
+            if not on_batch(batch):
+                break
+        return columns
+
+    async def aexecute(self, sql_query: str, on_batch: Callable[[list[tuple]], bool]) -> list[str]:
+        """Run a query in a worker thread, interrupting it after the statement timeout.
+
+        Args:
+            sql_query (str): A validated read query.
+            on_batch (Callable[[list[tuple]], bool]): Called with each batch of fetched rows, returns
+                whether more rows are wanted.
+
+        Returns:
+            list[str]: The column names.
+        """
+        conn = await asyncio.to_thread(self._get_conn)
+        with conn.cursor() as cursor:
+            task = asyncio.create_task(asyncio.to_thread(self._execute, cursor, sql_query, on_batch))
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), app_config.sql_statement_timeout_ms / 1000)
+            except TimeoutError:
+                cursor.interrupt()
+                await asyncio.gather(task, return_exceptions=True)
+                raise
+
+
+duckdb_service = DuckDbService()
@@ -0,0 +1,135 @@
+import hashlib
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import app_config
+from src.database import Database
+from src.modules.utils.cache_util import TTLCache, normalize_query
+
+
+# bounded, so a store never stalls on a large backlog of expired rows; later stores take the rest
+DELETE_EXPIRED_EMBEDDINGS_SQL = """
+    DELETE FROM {table}
+    WHERE cache_key IN (
+        SELECT cache_key FROM {table}
+        WHERE created_at < now() - make_interval(secs => %(ttl)s)
+        LIMIT %(batch_size)s
+    )
+"""
+
+EXPIRED_EMBEDDINGS_BATCH_SIZE = 1000
+
+
+class EmbeddingCacheService:
+    """Cache of query embeddings keyed on the normalized query and the embedding model and size.
+
+    The first tier is an in-process LRU cache. The optional second tier is a Postgres table shared
+    by every app process, whose expired rows are deleted whenever a new vector is stored.
+    """
+
+    def __init__(self, db: Database, embeddings: Embeddings):
+        self._db = db
+        self._embeddings = embeddings
+        self._cache = TTLCache(
+            max_size=app_config.query_embedding_cache_size,
+            ttl_seconds=app_config.query_embedding_cache_ttl_seconds,
+        )
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    def _key(self, query: str) -> str:
+        return hashlib.sha256(f"{app_config.embedding_model}\n{app_config.embedding_dimension}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    async def setup(self) -> None:
+        """Create the shared cache table if the Postgres tier is enabled.
+        """
+        if not app_config.query_embedding_cache_postgres:
+            return
+
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {app_config.query_embedding_cache_table_name} (
+                    cache_key VARCHAR(64) PRIMARY KEY,
+                    model VARCHAR(255) NOT NULL,
+                    embedding REAL[] NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+            await cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {app_config.query_embedding_cache_table_name}_created_at_idx "
+                f"ON {app_config.query_embedding_cache_table_name} (created_at)"
+            )
+            await db_conn.commit()
+
+    async def _aget_shared(self, key: str) -> list[float] | None:
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                SELECT embedding FROM {app_config.query_embedding_cache_table_name}
+                WHERE cache_key = %(key)s AND (%(ttl)s = 0 OR created_at > now() - make_interval(secs => %(ttl)s))
+                """,
+                {"key": key, "ttl": app_config.query_embedding_cache_ttl_seconds},
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _aset_shared(self, key: str, vector: list[float]) -> None:
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                INSERT INTO {app_config.query_embedding_cache_table_name} (cache_key, model, embedding)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE SET embedding = EXCLUDED.embedding, created_at = now()
+                """,
+                (key, app_config.embedding_model, vector),
+            )
+            if app_config.query_embedding_cache_ttl_seconds:
+                await cursor.execute(
+                    DELETE_EXPIRED_EMBEDDINGS_SQL.format(table=app_config.query_embedding_cache_table_name),
+                    {"ttl": app_config.query_embedding_cache_ttl_seconds, "batch_size": EXPIRED_EMBEDDINGS_BATCH_SIZE},
+                )
+            await db_conn.commit()
+
+    async def aembed_query(self, query: str) -> list[float]:
+        """Embed a query, reusing a cached vector when possible.
+
+        Args:
+            query (str): The query to embed.
+
+        Returns:
+            list[float]: The query vector.
+        """
+        key = self._key(query)
+
+        vector = self._cache.get(key)
+        if vector is not None:
+            return vector
+
+        if app_config.query_embedding_cache_postgres:
+            vector = await self._aget_shared(key)
+            if vector is not None:
+                self.shared_hits += 1
+                self._cache.set(key, vector)
+                return vector
+            self.shared_misses += 1
+
+        vector = await self._embeddings.aembed_query(query)
+        self._cache.set(key, vector)
+        if app_config.query_embedding_cache_postgres:
+            await self._aset_shared(key, vector)
+
+        return vector
+
+    def stats(self) -> dict[str, float]:
+        """Get the hit and miss counters of both tiers.
+
+        Returns:
+            dict[str, float]: The counters of the in-process tier, plus the shared tier hits and misses.
+        """
+        return {
+            **self._cache.stats(),
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+        }
@@ -0,0 +1,84 @@
+import asyncio
+import random
+import time
+
+from collections.abc import Awaitable, Callable
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import app_config
+
+
+class EmbeddingService:
+    """Embed documents in fixed-size batches with a bounded number of requests in flight.
+
+    A new batch is only submitted once a slot frees up, so a slow provider slows the producer down
+    instead of piling up requests. Every batch is retried with exponential backoff and handed to the
+    writer as soon as it is embedded.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        self._embeddings = embeddings
+        self._batch_size = max(batch_size or app_config.embedding_batch_size, 1)
+        self._max_concurrency = max(max_concurrency or app_config.embedding_max_concurrency, 1)
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed a batch of texts, retrying with exponential backoff and jitter.
+
+        Args:
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list[list[float]]: One vector per text.
+        """
+        for attempt in range(app_config.embedding_max_retries + 1):
+            try:
+                return await self._embeddings.aembed_documents(texts)
+            except Exception as e:
+                if attempt == app_config.embedding_max_retries:
+                    raise
+                delay = app_config.embedding_retry_initial_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+                print(f"Embedding batch failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        # only reached when no attempt was made at all, a batch must never be dropped silently
+        raise ValueError(f"EMBEDDING_MAX_RETRIES must not be negative, got {app_config.embedding_max_retries}.")
+
+    async def arun(
+        self,
+        docs: list[Document],
+        on_batch: Callable[[list[Document], list[list[float]]], Awaitable[None]],
+    ) -> None:
+        """Embed the documents and hand every finished batch to the writer.
+
+        Args:
+            docs (list[Document]): The documents to embed.
+            on_batch (Callable[[list[Document], list[list[float]]], Awaitable[None]]): Writer called
+                with each batch of documents and their vectors.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        started_at = time.perf_counter()
+        embedded = 0
+
+        async def worker(batch: list[Document]) -> None:
+            nonlocal embedded
+            try:
+                vectors = await self._aembed_batch([doc.page_content for doc in batch])
+                await on_batch(batch, vectors)
+            finally:
+                semaphore.release()
+
+            embedded += len(batch)
+            elapsed = time.perf_counter() - started_at
+            print(f"Embedded {embedded}/{len(docs)} documents ({embedded / max(elapsed, 1e-9):,.1f} docs/sec)")
+
+        async with asyncio.TaskGroup() as task_group:
+            for start in range(0, len(docs), self._batch_size):
+                await semaphore.acquire()
+                task_group.create_task(worker(docs[start:start + self._batch_size]))
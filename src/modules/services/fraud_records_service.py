@@ -0,0 +1,205 @@
+import time
+
+from dataclasses import dataclass, field
+
+from langfuse import Langfuse
+from langfuse.model import PromptClient
+from psycopg.errors import UndefinedColumn, UndefinedTable
+
+from src.core.config import app_config
+from src.core.llm import llm_registry
+from src.core.metrics import metrics
+from src.database import Database
+from src.modules.const.enum import QueryBackendEnum
+from src.modules.services.duckdb_service import duckdb_service
+from src.modules.services.query_governor_service import QueryGovernorService, QueryRejectedError
+from src.modules.services.schema_service import schema_service
+from src.modules.services.sql_cache_service import SqlCacheService
+from src.modules.utils.supervisor_util import format_sql_results, format_sql_row
+
+
+@dataclass
+class ResultRows:
+    rows: list[str] = field(default_factory=list)
+    size: int = 0
+    truncated: bool = False
+
+    def add(self, batch: list[tuple]) -> bool:
+        """Render fetched rows until the row or byte cap is hit.
+
+        Args:
+            batch (list[tuple]): Rows just fetched.
+
+        Returns:
+            bool: Whether more rows are wanted.
+        """
+        for row in batch:
+            line = format_sql_row(row)
+            self.size += len(line.encode("utf-8")) + 1
+            if len(self.rows) >= app_config.sql_result_max_rows or self.size > app_config.sql_result_max_bytes:
+                self.truncated = True
+                return False
+            self.rows.append(line)
+        return True
+
+
+class FraudRecordsService:
+    """Answer natural-language questions over the fraud records by generating and running SQL.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._cache = SqlCacheService(db)
+        self._governor = QueryGovernorService()
+
+    async def _agenerate_sql(self, query: str, schema: str, prompt: PromptClient) -> str:
+        """Generate the SQL for a question, reusing the SQL generated for the same question before.
+
+        Args:
+            query (str): The user's search query.
+            schema (str): The formatted schema given to the prompt.
+            prompt (PromptClient): The SQL generation prompt.
+
+        Returns:
+            str: The SQL query.
+        """
+        sql_query = self._cache.get_sql(query, schema_service.version, prompt.version)
+        if sql_query is not None:
+            return sql_query
+
+        compiled_prompt = prompt.compile(
+            schema=schema,
+            query=query
+        )
+
+        with metrics.span("sql_generation"):
+            response = await llm_registry.get_prompt_llm(prompt).ainvoke(compiled_prompt)
+
+        sql_query = response.content.strip()
+        self._cache.set_sql(query, schema_service.version, prompt.version, sql_query)
+
+        return sql_query
+
+    async def _aexecute_postgres(self, sql_query: str, result: ResultRows) -> list[str]:
+        """Run a governed SQL query on Postgres.
+
+        The query runs read-only with a statement timeout, after the governor checked its plan. With
+        `sql_result_server_cursor` the rows are fetched through a server-side cursor in batches of
+        `sql_result_fetch_size`, so a query without a LIMIT never materializes the whole result.
+
+        Args:
+            sql_query (str): The SQL query.
+            result (ResultRows): Collects the fetched rows.
+
+        Returns:
+            list[str]: The column names.
+        """
+        fetch_size = max(app_config.sql_result_fetch_size, 1)
+
+        async with self._db.get_postgres_db() as conn, conn.transaction():
+            async with conn.cursor() as plan_cursor:
+                sql_query = await self._governor.aprepare(plan_cursor, sql_query)
+
+            cursor = conn.cursor(name="search_fraud_records") if app_config.sql_result_server_cursor else conn.cursor()
+            async with cursor:
+                await cursor.execute(sql_query)
+                columns = [column.name for column in cursor.description or []]
+
+                while batch := await cursor.fetchmany(fetch_size):
+                    if not result.add(batch):
+                        break
+
+        return columns
+
+    async def _aexecute_duckdb(self, sql_query: str, result: ResultRows) -> list[str]:
+        """Run a validated SQL query on the in-process DuckDB copy of the tabular data.
+
+        Args:
+            sql_query (str): The SQL query.
+            result (ResultRows): Collects the fetched rows.
+
+        Returns:
+            list[str]: The column names.
+        """
+        sql_query = self._governor.validate(sql_query)
+        return await duckdb_service.aexecute(sql_query, result.add)
+
+    async def _aexecute(self, sql_query: str) -> str:
+        """Run a SQL query on the configured backend and render its result, stopping at the row or byte cap.
+
+        Args:
+            sql_query (str): The SQL query.
+
+        Returns:
+            str: The rendered result.
+
+        Raises:
+            QueryRejectedError: If the governor refused the query.
+        """
+        backend = app_config.tabular_query_backend
+        result = ResultRows()
+
+        started_at = time.perf_counter()
+        with metrics.span("sql_execution", backend=backend.value):
+            if backend == QueryBackendEnum.DUCKDB:
+                columns = await self._aexecute_duckdb(sql_query, result)
+            else:
+                columns = await self._aexecute_postgres(sql_query, result)
+        print(f"{backend.value} query took {(time.perf_counter() - started_at) * 1000:.1f} ms for {len(result.rows)} rows.")
+
+        return format_sql_results(columns, result.rows, result.truncated)
+
+    async def asearch(self, query: str, langfuse_client: Langfuse) -> str:
+        """Search fraud records matching a natural-language question.
+
+        Args:
+            query (str): The user's search query.
+            langfuse_client (Langfuse): The Langfuse client holding the SQL generation prompt.
+
+        Returns:
+            str: Retrieved fraud records, or the reason the search failed.
+        """
+        try:
+            with metrics.span("schema_fetch"):
+                schema = await schema_service.aget_schema()
+        except Exception as e:
+            return f"Failed to get schema information: {str(e)}"
+
+        with metrics.span("prompt_fetch", prompt="search_fraud_records"):
+            prompt = langfuse_client.get_prompt(
+                "search_fraud_records",
+                label="latest",
+                cache_ttl_seconds=600,
+            )
+        sql_query = await self._agenerate_sql(query, schema, prompt)
+
+        results_str = await self._cache.aget_result(sql_query)
+        if results_str is not None:
+            return results_str
+
+        try:
+            results_str = await self._aexecute(sql_query)
+        except Exception as e:
+            self._cache.discard_sql(query, schema_service.version, prompt.version)
+            if isinstance(e, (UndefinedTable, UndefinedColumn)):
+                # the schema may have changed since it was cached, the next call introspects it again
+                schema_service.invalidate()
+            rejection = e if isinstance(e, QueryRejectedError) else QueryRejectedError.from_database_error(e)
+            if rejection is not None:
+                return rejection.to_json()
+            return f"Failed to execute SQL query: {str(e)}"
+
+        self._cache.set_result(sql_query, results_str)
+
+        return results_str
+
+    def cache_stats(self) -> dict[str, dict[str, float]]:
+        """Get the hit and miss counters of the SQL and result caches.
+
+        Returns:
+            dict[str, dict[str, float]]: The cache counters.
+        """
+        return self._cache.stats()
+
+
+fraud_records_service = FraudRecordsService(Database())
@@ -0,0 +1,156 @@
+import hashlib
+
+from src.core.config import app_config
+from src.database import Database
+
+
+FILE_KEY = "__file__"
+
+
+def file_sha256(filename: str) -> str:
+    """Hash a file without loading it into memory at once.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    """Hash a text.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: Hex digest of the text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_changed(manifest: dict[str, str], key: str, content_hash: str) -> bool:
+    """Check whether an item is new or changed since the last run.
+
+    Args:
+        manifest (dict[str, str]): The stored hashes of the source.
+        key (str): The item key.
+        content_hash (str): The current hash of the item.
+
+    Returns:
+        bool: Whether the item has to be (re)loaded.
+    """
+    return manifest.get(key) != content_hash
+
+
+def get_vanished_keys(manifest: dict[str, str], hashes: dict[str, str]) -> list[str]:
+    """Get the items of the last run that are gone from the source.
+
+    Args:
+        manifest (dict[str, str]): The stored hashes of the source.
+        hashes (dict[str, str]): The current hashes of the source.
+
+    Returns:
+        list[str]: The keys to delete, never the `FILE_KEY`.
+    """
+    return [key for key in manifest if key != FILE_KEY and key not in hashes]
+
+
+class ManifestService:
+    """Keep the content hash of every ingested item per source, so reruns only touch what changed.
+
+    A source is the table the content is loaded into. The special `FILE_KEY` item holds the hash
+    of the whole source file and doubles as the data version of that source.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+
+    async def setup(self) -> None:
+        """Create the manifest table if it doesn't exist.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {app_config.ingestion_manifest_table_name} (
+                    source VARCHAR(255) NOT NULL,
+                    item_key VARCHAR(255) NOT NULL,
+                    content_hash VARCHAR(64) NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (source, item_key)
+                )
+                """
+            )
+            await db_conn.commit()
+
+    async def aget_hashes(self, source: str) -> dict[str, str]:
+        """Get the stored hashes of a source.
+
+        Args:
+            source (str): The source name.
+
+        Returns:
+            dict[str, str]: Content hash by item key.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"SELECT item_key, content_hash FROM {app_config.ingestion_manifest_table_name} WHERE source = %s",
+                (source,),
+            )
+            return dict(await cursor.fetchall())
+
+    async def aget_version(self, source: str) -> str | None:
+        """Get the data version of a source, i.e. the hash of the last fully ingested file.
+
+        Args:
+            source (str): The source name.
+
+        Returns:
+            str | None: The version, or None if the source was never ingested.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                f"SELECT content_hash FROM {app_config.ingestion_manifest_table_name} WHERE source = %s AND item_key = %s",
+                (source, FILE_KEY),
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def aupdate(self, source: str, upserts: dict[str, str], deletes: list[str], replace: bool = False) -> None:
+        """Record the outcome of an ingestion run in a single transaction.
+
+        Args:
+            source (str): The source name.
+            upserts (dict[str, str]): Content hash by item key for new or changed items.
+            deletes (list[str]): Keys of items that vanished from the source.
+            replace (bool, optional): Whether to forget every other item of the source first. Defaults to False.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            if replace:
+                await cursor.execute(
+                    f"DELETE FROM {app_config.ingestion_manifest_table_name} WHERE source = %s",
+                    (source,),
+                )
+            elif deletes:
+                await cursor.execute(
+                    f"DELETE FROM {app_config.ingestion_manifest_table_name} WHERE source = %s AND item_key = ANY(%s)",
+                    (source, deletes),
+                )
+
+            if upserts:
+                await cursor.executemany(
+                    f"""
+                    INSERT INTO {app_config.ingestion_manifest_table_name} (source, item_key, content_hash)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (source, item_key)
+                    DO UPDATE SET content_hash = EXCLUDED.content_hash, updated_at = now()
+                    """,
+                    [(source, key, content_hash) for key, content_hash in upserts.items()],
+                )
+            await db_conn.commit()
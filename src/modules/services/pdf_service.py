@@ -1,84 +1,226 @@
+import os
 import pymupdf
 import pymupdf4llm
-from pydantic import SecretStr
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import cast
+from uuid import NAMESPACE_URL, uuid5
 
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
 from langchain_postgres import PGVectorStore
 
 from src.core.config import app_config
+from src.core.embedding import get_embeddings
+from src.core.metrics import metrics
 from src.database import Database
+from src.modules.services.embedding_service import EmbeddingService
+from src.modules.services.manifest_service import FILE_KEY, ManifestService, file_sha256, get_vanished_keys, is_changed, text_sha256
+from src.modules.services.vector_index_service import VectorIndexService, get_vector_type
+from src.modules.utils.chunk_util import chunk_documents
+
+
+def parse_pages(filename: str, pages: list[int]) -> list[dict]:
+    """Convert a range of PDF pages to markdown. Runs inside a worker process, which opens the file itself.
+
+    Args:
+        filename (str): Path of the PDF file.
+        pages (list[int]): Zero-based page numbers to convert.
+
+    Returns:
+        list[dict]: The text and the one-based page number of every converted page.
+    """
+    with pymupdf.open(filename) as document:
+        md_text = pymupdf4llm.to_markdown(document, pages=pages, page_chunks=True, ignore_images=False, ignore_graphics=False)
+        md_text = cast(list, md_text)
+
+    return [
+        {
+            "text": page.get("text"),
+            "page": page.get("metadata", {}).get("page"),
+        }
+        for page in md_text
+    ]
 
 
 class PdfParserService:
 
     def __init__(self, db: Database):
         self._db = db
+        self._manifest = ManifestService(db)
+        self._vector_index = VectorIndexService(db)
 
     def _parse_content(self) -> list[Document]:
         """Parse the content of a PDF file and return a list of Document objects containing the text content of each page.
 
+        Page ranges are converted in parallel by a process pool when more than one worker is configured.
+
         Returns:
             list[Document]: A list of Document objects containing the text content of each page.
         """
         try:
-            document = pymupdf.open(app_config.pdf_filename)
+            with pymupdf.open(app_config.pdf_filename) as document:
+                page_count = document.page_count
         except Exception as e:
             print(f"Error opening PDF document: {e}")
             return []
 
+        pages_per_task = max(app_config.pdf_parse_pages_per_task, 1)
+        tasks = [list(range(start, min(start + pages_per_task, page_count))) for start in range(0, page_count, pages_per_task)]
+        workers = min(app_config.pdf_parse_workers or os.cpu_count() or 1, len(tasks))
+
         try:
-            md_text = pymupdf4llm.to_markdown(document, page_chunks=True, ignore_images=False, ignore_graphics=False)
-            md_text = cast(list, md_text)
+            if workers <= 1:
+                results = [parse_pages(app_config.pdf_filename, pages) for pages in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(parse_pages, repeat(app_config.pdf_filename), tasks))
         except Exception as e:
             print(f"Markdown conversion failed: {e}")
             return []
-        finally:
-            if document is not None:
-                document.close()
 
         pdf_contents = []
-        for page in md_text:
-            pdf_contents.append(
-                Document(
-                    page_content=page.get("text"),
-                    metadata={
-                        "page": page.get("metadata", {}).get("page")
-                    },
+        for pages in results:
+            for page in pages:
+                pdf_contents.append(
+                    Document(
+                        page_content=page["text"],
+                        metadata={
+                            "page": page["page"]
+                        },
+                    )
                 )
-            )
 
         return pdf_contents
     
-    async def _insert(self) -> None:
-        """Insert PDF content to database.
+    def _document_id(self, source: str, key: str) -> str:
+        """Derive a stable document id, so re-ingested content overwrites its previous version.
+
+        Args:
+            source (str): The source name.
+            key (str): The manifest key of the document.
+
+        Returns:
+            str: The document id.
+        """
+        return str(uuid5(NAMESPACE_URL, f"{source}:{key}"))
+
+    async def _aget_column_type(self) -> str | None:
+        """Get the type of the embedding column of the vector table.
+
+        Returns:
+            str | None: The column type, e.g. `vector(768)`, or None when the table doesn't exist.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                """
+                SELECT format_type(atttypid, atttypmod)
+                FROM pg_attribute
+                WHERE attrelid = to_regclass(%s) AND attname = 'embedding'
+                """,
+                (app_config.pdf_vector_table_name,),
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _init_table(self) -> None:
+        """Create the vector table, dropping an existing one.
         """
-        pgvector_engine = self._db.get_pgvector_engine()
-        await pgvector_engine.ainit_vectorstore_table(
+        await self._db.get_pgvector_engine().ainit_vectorstore_table(
             table_name=app_config.pdf_vector_table_name,
-            vector_size=4096,
+            vector_size=app_config.embedding_dimension,
+            overwrite_existing=True,
         )
 
-        docs = self._parse_content()
+        vector_type = get_vector_type(app_config.embedding_dimension)
+        if vector_type.startswith("halfvec"):
+            # the vector store always creates a `vector` column, which cannot be indexed this wide
+            async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+                await cursor.execute(f"ALTER TABLE {app_config.pdf_vector_table_name} ALTER COLUMN embedding TYPE {vector_type}")
+                await db_conn.commit()
+
+    async def _insert(self) -> None:
+        """Insert PDF content to database, embedding only the chunks that changed since the last run.
+        """
+        source = app_config.pdf_vector_table_name
+        # the embedding settings are part of every chunk hash, changing them re-embeds every chunk
+        embedding_fingerprint = f"{app_config.embedding_model}:{app_config.embedding_dimension}"
+        # the chunking settings are part of the file fingerprint, changing them re-chunks the file
+        file_hash = text_sha256(
+            f"{file_sha256(app_config.pdf_filename)}:{app_config.pdf_chunk_size}:{app_config.pdf_chunk_overlap}:{embedding_fingerprint}"
+        )
+
+        manifest = await self._manifest.aget_hashes(source) if app_config.ingestion_incremental else {}
+        if manifest.get(FILE_KEY) == file_hash:
+            print(f"PDF {app_config.pdf_filename} is unchanged, skipping.")
+            return
+
+        # without a manifest the table content is unknown, and a column of another dimension cannot
+        # hold the new embeddings, so the table is rebuilt from scratch in both cases
+        full_rebuild = not manifest or await self._aget_column_type() != get_vector_type(app_config.embedding_dimension)
+        if full_rebuild:
+            manifest = {}
+            await self._init_table()
+
+        with metrics.span("pdf_parse"):
+            docs = chunk_documents(
+                self._parse_content(),
+                chunk_size=app_config.pdf_chunk_size,
+                chunk_overlap=app_config.pdf_chunk_overlap,
+            )
         if not docs:
             raise ValueError("No docs (PDF contents) to insert.")
 
-        embeddings = OpenAIEmbeddings(
-                model="qwen/qwen3-embedding-8b",
-                api_key=SecretStr(app_config.openrouter_api_key),
-                base_url="https://openrouter.ai/api/v1",
-            )
+        hashes = {}
+        changed_docs = []
+        for doc in docs:
+            key = f"page-{doc.metadata.get('page')}-chunk-{doc.metadata.get('chunk')}"
+            doc.id = self._document_id(source, key)
+            hashes[key] = text_sha256(f"{embedding_fingerprint}:{doc.page_content}")
+            if is_changed(manifest, key, hashes[key]):
+                changed_docs.append((key, doc))
+
+        vanished_keys = get_vanished_keys(manifest, hashes)
+
+        embeddings = get_embeddings()
 
         store = await PGVectorStore.create(
             embedding_service=embeddings,
-            engine=pgvector_engine,
+            engine=self._db.get_pgvector_engine(),
             table_name=app_config.pdf_vector_table_name,
         )
 
-        await store.aadd_documents(docs)
+        async def write_batch(batch: list[Document], vectors: list[list[float]]) -> None:
+            await store.aadd_embeddings(
+                texts=[doc.page_content for doc in batch],
+                embeddings=vectors,
+                metadatas=[doc.metadata for doc in batch],
+                ids=[doc.id for doc in batch],
+            )
+
+        if changed_docs:
+            with metrics.span("pdf_embed"):
+                await EmbeddingService(embeddings).arun([doc for _, doc in changed_docs], on_batch=write_batch)
+            metrics.increment("ingested_items_total", len(changed_docs), source=source)
+        if vanished_keys:
+            await store.adelete([self._document_id(source, key) for key in vanished_keys])
+        print(f"PDF {app_config.pdf_filename}: {len(changed_docs)} upserted, {len(docs) - len(changed_docs)} unchanged, {len(vanished_keys)} deleted.")
+
+        # built after the bulk load, which is much faster than maintaining the index row by row
+        with metrics.span("vector_index"):
+            await self._vector_index.aensure_index(
+                store,
+                reindex=app_config.pdf_vector_reindex_after_ingest and not full_rebuild,
+            )
+
+        await self._manifest.aupdate(
+            source,
+            upserts={key: hashes[key] for key, _ in changed_docs} | {FILE_KEY: file_hash},
+            deletes=vanished_keys,
+            replace=full_rebuild,
+        )
 
     async def process(self) -> None:
         """Process the PDF file and insert its content into the database.
         """
+        await self._manifest.setup()
         await self._insert()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import re
+
+from psycopg import AsyncCursor
+from psycopg.errors import QueryCanceled, ReadOnlySqlTransaction
+
+from src.core.config import app_config
+
+
+READ_QUERY_PATTERN = re.compile(r"^\s*\(*\s*(select|with)\b", re.IGNORECASE)
+
+# string literals, quoted identifiers, dollar-quoted strings and comments, which may hold a ";"
+# without ending the statement; an unterminated quote is left in place, so its ";" still counts
+QUOTED_OR_COMMENT_PATTERN = re.compile(
+    r"'(?:[^']|'')*'"
+    r'|"(?:[^"]|"")*"'
+    r"|\$(\w*)\$.*?\$\1\$"
+    r"|--[^\n]*"
+    r"|/\*.*?\*/",
+    re.DOTALL,
+)
+
+
+class QueryRejectedError(Exception):
+    """Raised when generated SQL is refused before or while running it.
+
+    The error is rendered as JSON for the agent, so it can tell why the query was refused and
+    retry with a cheaper one.
+    """
+
+    def __init__(self, reason: str, message: str, **details):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+        self.details = details
+
+    def to_json(self) -> str:
+        """Render the rejection for the agent.
+
+        Returns:
+            str: The rejection as a JSON object.
+        """
+        return json.dumps({
+            "error": "query_rejected",
+            "reason": self.reason,
+            "message": self.message,
+            **self.details,
+        })
+
+    @classmethod
+    def from_database_error(cls, error: Exception) -> "QueryRejectedError | None":
+        """Map a database error raised by a governed query to a rejection.
+
+        Args:
+            error (Exception): The error raised while running the query.
+
+        Returns:
+            QueryRejectedError | None: The rejection, or None if the error isn't governor related.
+        """
+        if isinstance(error, (QueryCanceled, TimeoutError)):
+            return cls(
+                "timeout",
+                "The query ran longer than the statement timeout. Filter on indexed columns, aggregate or use a rollup table.",
+                timeout_ms=app_config.sql_statement_timeout_ms,
+            )
+        if isinstance(error, ReadOnlySqlTransaction):
+            return cls("read_only", "Only read-only SELECT queries are allowed.")
+        return None
+
+
+class QueryGovernorService:
+    """Check generated SQL before it runs and bound what it may cost.
+
+    Queries run in a read-only transaction with a statement timeout. Their plan is estimated with
+    `EXPLAIN` first: plans returning too many rows are wrapped in a LIMIT, plans over the cost
+    limit are rejected.
+    """
+
+    def validate(self, sql_query: str) -> str:
+        """Check that the SQL is a single read query.
+
+        Args:
+            sql_query (str): The generated SQL.
+
+        Returns:
+            str: The SQL without trailing semicolons.
+
+        Raises:
+            QueryRejectedError: If the SQL isn't a single SELECT or WITH query.
+        """
+        sql_query = sql_query.strip().rstrip(";").strip()
+        if not READ_QUERY_PATTERN.match(sql_query):
+            raise QueryRejectedError("not_select", "Only a single SELECT or WITH query is allowed.")
+        if ";" in QUOTED_OR_COMMENT_PATTERN.sub(" ", sql_query):
+            raise QueryRejectedError("multiple_statements", "Only a single SELECT or WITH query is allowed.")
+        return sql_query
+
+    async def _aexplain(self, cursor: AsyncCursor, sql_query: str) -> tuple[float, float]:
+        """Estimate the cost and row count of a query.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+            sql_query (str): The SQL query.
+
+        Returns:
+            tuple[float, float]: The estimated total cost and number of rows.
+        """
+        await cursor.execute(f"EXPLAIN (FORMAT JSON) {sql_query}")
+        plan = (await cursor.fetchone())[0][0]["Plan"]
+        return plan["Total Cost"], plan["Plan Rows"]
+
+    async def aprepare(self, cursor: AsyncCursor, sql_query: str) -> str:
+        """Make the transaction read-only with a statement timeout, then check and rewrite the query.
+
+        Must be called first in the transaction the query runs in.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+            sql_query (str): The generated SQL.
+
+        Returns:
+            str: The SQL to run, wrapped in a LIMIT when it was estimated to return too many rows.
+
+        Raises:
+            QueryRejectedError: If the SQL isn't a read query or its estimated cost is over the limit.
+        """
+        sql_query = self.validate(sql_query)
+
+        await cursor.execute("SET TRANSACTION READ ONLY")
+        await cursor.execute(
+            "SELECT set_config('statement_timeout', %s, true)",
+            (str(app_config.sql_statement_timeout_ms),),
+        )
+
+        if not app_config.sql_governor_enabled:
+            return sql_query
+
+        cost, rows = await self._aexplain(cursor, sql_query)
+
+        if rows > app_config.sql_governor_max_rows:
+            # one row more than the result cap, so the truncation note is still shown
+            limit = app_config.sql_result_max_rows + 1
+            sql_query = f"SELECT * FROM ({sql_query}) AS governed_query LIMIT {limit}"
+            print(f"Governor limited a query estimated at {rows:,.0f} rows to {limit} rows.")
+            cost, rows = await self._aexplain(cursor, sql_query)
+
+        if cost > app_config.sql_governor_max_cost:
+            raise QueryRejectedError(
+                "cost",
+                "The estimated cost of the query is over the limit. Filter on indexed columns, aggregate or use a rollup table.",
+                estimated_cost=cost,
+                max_cost=app_config.sql_governor_max_cost,
+                estimated_rows=rows,
+            )
+
+        return sql_query
@@ -0,0 +1,107 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_postgres import PGVectorStore
+
+from src.core.config import app_config
+from src.core.embedding import get_embeddings
+from src.core.metrics import metrics
+from src.database import Database
+from src.modules.services.embedding_cache_service import EmbeddingCacheService
+from src.modules.services.vector_index_service import get_vector_index_query_options
+
+
+class PdfRetrievalService:
+    """Long-lived vector store and embedding client for PDF retrieval.
+
+    Both are built once and shared by every tool call, so a search costs at most one query embedding
+    request, skipped for cached queries, plus one vector query.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._embeddings: Embeddings | None = None
+        self._embedding_cache: EmbeddingCacheService | None = None
+        self._store: PGVectorStore | None = None
+        self._lock = asyncio.Lock()
+
+    async def _atable_exists(self) -> bool:
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute("SELECT to_regclass(%s)", (app_config.pdf_vector_table_name,))
+            row = await cursor.fetchone()
+        return bool(row and row[0] is not None)
+
+    async def setup(self) -> None:
+        """Create the embedding client and the vector store if they don't exist yet.
+
+        The vector store is skipped while the PDF table doesn't exist, e.g. before the first
+        ingestion, and is created on a later call instead.
+        """
+        async with self._lock:
+            if self._embedding_cache is None:
+                embeddings = get_embeddings()
+                embedding_cache = EmbeddingCacheService(self._db, embeddings)
+                await embedding_cache.setup()
+                self._embeddings = embeddings
+                self._embedding_cache = embedding_cache
+
+            if self._store is not None:
+                return
+
+            if not await self._atable_exists():
+                print(f"PDF table {app_config.pdf_vector_table_name} doesn't exist yet, run pre_processing.py to ingest the PDF.")
+                return
+
+            self._store = await PGVectorStore.create(
+                embedding_service=self._embeddings,
+                engine=self._db.get_pgvector_engine(),
+                table_name=app_config.pdf_vector_table_name,
+                index_query_options=get_vector_index_query_options(),
+            )
+
+    async def aembed_query(self, query: str) -> list[float]:
+        """Embed a query through the query embedding cache.
+
+        Args:
+            query (str): The query.
+
+        Returns:
+            list[float]: The query embedding.
+        """
+        if self._embedding_cache is None:
+            await self.setup()
+
+        with metrics.span("query_embedding"):
+            return await self._embedding_cache.aembed_query(query)
+
+    async def asearch(self, query: str, k: int = 3) -> list[Document]:
+        """Search the PDF contents most similar to the query.
+
+        Args:
+            query (str): The search query.
+            k (int, optional): Number of documents to return. Defaults to 3.
+
+        Returns:
+            list[Document]: The most similar documents.
+        """
+        if self._store is None:
+            await self.setup()
+        if self._store is None:
+            raise ValueError(f"PDF table {app_config.pdf_vector_table_name} doesn't exist, run pre_processing.py first.")
+
+        query_vector = await self.aembed_query(query)
+
+        with metrics.span("vector_search"):
+            return await self._store.asimilarity_search_by_vector(query_vector, k=k)
+
+    def embedding_cache_stats(self) -> dict[str, float]:
+        """Get the hit and miss counters of the query embedding cache.
+
+        Returns:
+            dict[str, float]: The cache counters, empty before setup.
+        """
+        return self._embedding_cache.stats() if self._embedding_cache else {}
+
+
+pdf_retrieval_service = PdfRetrievalService(Database())
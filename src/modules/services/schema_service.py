@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import time
+
+from src.core.config import app_config
+from src.database import Database
+from src.modules.const.enum import QueryBackendEnum
+from src.modules.services.duckdb_service import duckdb_service
+from src.modules.services.tabular_data_service import get_rollup_table_names
+
+
+# changes whenever an allow-listed relation is created or recreated, or gains, loses or retypes a
+# column or a partition
+DDL_FINGERPRINT_SQL = """
+    WITH relations AS (
+        SELECT c.oid
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = ANY(%(tables)s)
+    )
+    SELECT md5(concat(
+        (
+            SELECT string_agg(concat_ws(':', a.attrelid, a.attnum, a.attname, a.atttypid, a.atttypmod, a.attisdropped), ',' ORDER BY a.attrelid, a.attnum)
+            FROM pg_attribute a
+            WHERE a.attrelid IN (SELECT oid FROM relations) AND a.attnum > 0
+        ),
+        '/',
+        (SELECT count(*) FROM pg_inherits i WHERE i.inhparent IN (SELECT oid FROM relations))
+    ))
+"""
+
+
+class SchemaService:
+    """Cached, formatted schema of the tables exposed to SQL generation.
+
+    The schema is introspected once and reused until its TTL expires, its DDL fingerprint changes or
+    it is invalidated, e.g. after a query failed on a missing table or column. The fingerprint is
+    checked on every call with a single catalog query, so tables, columns and partitions added by
+    another process, e.g. the ingestion, show up right away. Only allow-listed tables are included,
+    which keeps the checkpoint, vector and cache tables out of the prompt.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._schema: str | None = None
+        self._version = ""
+        self._fingerprint: str | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> str:
+        """Version of the cached schema, which changes whenever the formatted schema changes.
+
+        Returns:
+            str: The schema version, empty before the schema is loaded.
+        """
+        return self._version
+
+    def allowed_tables(self) -> list[str]:
+        """Get the tables exposed to SQL generation.
+
+        Returns:
+            list[str]: The configured allow-list, or the tabular table and its rollups by default.
+        """
+        return app_config.sql_schema_tables or [app_config.tabular_table_name, *get_rollup_table_names()]
+
+    def invalidate(self) -> None:
+        """Drop the cached schema so that the next call introspects the database again.
+        """
+        self._schema = None
+
+    def _is_fresh(self, fingerprint: str) -> bool:
+        if self._schema is None or fingerprint != self._fingerprint:
+            return False
+        ttl = app_config.sql_schema_cache_ttl_seconds
+        return not ttl or time.monotonic() - self._loaded_at < ttl
+
+    async def _aget_fingerprint(self) -> str:
+        """Get a fingerprint of the DDL of the allow-listed tables on the query backend.
+
+        Returns:
+            str: The fingerprint, or the signature of the Parquet parts on DuckDB.
+        """
+        if app_config.tabular_query_backend == QueryBackendEnum.DUCKDB:
+            return str(await asyncio.to_thread(duckdb_service.get_signature))
+
+        async with self._db.get_postgres_db() as conn, conn.cursor() as cursor:
+            await cursor.execute(DDL_FINGERPRINT_SQL, {"tables": self.allowed_tables()})
+            row = await cursor.fetchone()
+        return row[0]
+
+    async def _aload_postgres(self) -> list[tuple]:
+        """Introspect the allow-listed tables on Postgres.
+
+        Returns:
+            list[tuple]: (table, column, data type, table description) rows in table order.
+        """
+        # pg_catalog rather than information_schema, which doesn't list materialized views
+        async with self._db.get_postgres_db() as conn, conn.cursor() as cursor:
+            await cursor.execute(
+                """
+                SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod), obj_description(c.oid, 'pg_class')
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_attribute a ON a.attrelid = c.oid
+                WHERE n.nspname = 'public'
+                    AND c.relname = ANY(%(tables)s)
+                    AND a.attnum > 0
+                    AND NOT a.attisdropped
+                    AND NOT a.attname = ANY(%(hidden_columns)s)
+                ORDER BY array_position(%(tables)s, c.relname::text), a.attnum
+                """,
+                {"tables": self.allowed_tables(), "hidden_columns": app_config.sql_schema_hidden_columns},
+            )
+            return await cursor.fetchall()
+
+    async def _aload(self) -> str:
+        """Introspect the allow-listed tables on the query backend and format their columns.
+
+        Returns:
+            str: The formatted schema.
+        """
+        if app_config.tabular_query_backend == QueryBackendEnum.DUCKDB:
+            schema_rows = await asyncio.to_thread(duckdb_service.describe, self.allowed_tables())
+        else:
+            schema_rows = await self._aload_postgres()
+
+        lines = []
+        current_table = None
+        for table_name, column_name, data_type, description in schema_rows:
+            if column_name in app_config.sql_schema_hidden_columns:
+                continue
+            if current_table != table_name:
+                lines.append(f"\n{table_name}:")
+                if description:
+                    lines.append(f"  -- {description}")
+                current_table = table_name
+            lines.append(f"  - {column_name}: {data_type}")
+
+        return "\n".join(lines) + "\n"
+
+    async def aget_schema(self) -> str:
+        """Get the formatted schema, introspecting the database only when the cache is stale.
+
+        Returns:
+            str: The formatted schema.
+        """
+        fingerprint = await self._aget_fingerprint()
+        if self._is_fresh(fingerprint):
+            return self._schema
+
+        async with self._lock:
+            if not self._is_fresh(fingerprint):
+                schema = await self._aload()
+                self._version = hashlib.sha256(f"{app_config.sql_schema_version}\n{schema}".encode("utf-8")).hexdigest()[:16]
+                self._schema = schema
+                self._fingerprint = fingerprint
+                self._loaded_at = time.monotonic()
+
+        return self._schema
+
+
+schema_service = SchemaService(Database())
@@ -0,0 +1,116 @@
+import time
+
+from src.core.config import app_config
+from src.database import Database
+from src.modules.services.manifest_service import ManifestService
+from src.modules.utils.cache_util import TTLCache, normalize_whitespace
+
+
+class SqlCacheService:
+    """Two-level cache for natural-language questions over the tabular data.
+
+    The first level maps a question, the schema version and the prompt version to the generated
+    SQL, so repeated questions skip the LLM call. Only the whitespace of the question is
+    normalized: its case is kept, since literals such as merchant names end up in case-sensitive
+    filters. The second level maps the SQL to its rendered result and is cleared whenever
+    ingestion records a new data version.
+    """
+
+    def __init__(self, db: Database):
+        self._manifest = ManifestService(db)
+        self._sql_cache = TTLCache(
+            max_size=app_config.sql_cache_size,
+            ttl_seconds=app_config.sql_cache_ttl_seconds,
+        )
+        self._result_cache = TTLCache(
+            max_size=app_config.sql_cache_size,
+            ttl_seconds=app_config.sql_result_cache_ttl_seconds,
+        )
+        self._data_version: str | None = None
+        self._data_version_checked_at = 0.0
+
+    def get_sql(self, question: str, schema_version: str, prompt_version: int | str) -> str | None:
+        """Get the SQL previously generated for a question.
+
+        Args:
+            question (str): The natural-language question.
+            schema_version (str): Version of the schema given to the prompt.
+            prompt_version (int | str): Version of the SQL generation prompt.
+
+        Returns:
+            str | None: The cached SQL, or None on a miss.
+        """
+        return self._sql_cache.get((normalize_whitespace(question), schema_version, prompt_version))
+
+    def set_sql(self, question: str, schema_version: str, prompt_version: int | str, sql_query: str) -> None:
+        """Store the SQL generated for a question.
+
+        Args:
+            question (str): The natural-language question.
+            schema_version (str): Version of the schema given to the prompt.
+            prompt_version (int | str): Version of the SQL generation prompt.
+            sql_query (str): The generated SQL.
+        """
+        self._sql_cache.set((normalize_whitespace(question), schema_version, prompt_version), sql_query)
+
+    def discard_sql(self, question: str, schema_version: str, prompt_version: int | str) -> None:
+        """Forget the SQL generated for a question, e.g. because it failed to run.
+
+        Args:
+            question (str): The natural-language question.
+            schema_version (str): Version of the schema given to the prompt.
+            prompt_version (int | str): Version of the SQL generation prompt.
+        """
+        self._sql_cache.delete((normalize_whitespace(question), schema_version, prompt_version))
+
+    async def _arefresh_data_version(self) -> None:
+        """Clear the result cache when ingestion recorded a new version of the tabular data.
+
+        The version is read at most once every `sql_cache_data_version_check_seconds`.
+        """
+        now = time.monotonic()
+        if now - self._data_version_checked_at < app_config.sql_cache_data_version_check_seconds:
+            return
+        self._data_version_checked_at = now
+
+        try:
+            data_version = await self._manifest.aget_version(app_config.tabular_table_name)
+        except Exception as e:
+            print(f"Failed to read the tabular data version, clearing cached results: {e}")
+            data_version = None
+
+        if data_version is None or data_version != self._data_version:
+            self._result_cache.clear()
+        self._data_version = data_version
+
+    async def aget_result(self, sql_query: str) -> str | None:
+        """Get the cached result of a SQL query.
+
+        Args:
+            sql_query (str): The SQL query.
+
+        Returns:
+            str | None: The rendered result, or None on a miss.
+        """
+        await self._arefresh_data_version()
+        return self._result_cache.get(sql_query.strip())
+
+    def set_result(self, sql_query: str, result: str) -> None:
+        """Store the result of a SQL query.
+
+        Args:
+            sql_query (str): The SQL query.
+            result (str): The rendered result.
+        """
+        self._result_cache.set(sql_query.strip(), result)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Get the hit and miss counters of both levels.
+
+        Returns:
+            dict[str, dict[str, float]]: The counters of the SQL and result caches.
+        """
+        return {
+            "sql": self._sql_cache.stats(),
+            "result": self._result_cache.stats(),
+        }
@@ -1,57 +1,222 @@
+import asyncio
+import hashlib
 import pandas as pd
+import time
 
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+from pandas.io.parsers import TextFileReader
+from pathlib import Path
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg.errors import FeatureNotSupported
 
 from src.core.config import app_config
+from src.core.metrics import metrics
 from src.database import Database
+from src.modules.const.enum import CopyFormatEnum, LoadMethodEnum, QueryBackendEnum
+from src.modules.services.manifest_service import FILE_KEY, ManifestService, file_sha256, get_vanished_keys, is_changed, text_sha256
+
+
+TABULAR_COLUMNS = ["transaction_date", "merchant", "merchant_category", "gender", "state", "job", "age", "fraud_flag"]
+LOAD_COLUMNS = [*TABULAR_COLUMNS, "ingest_batch"]
+LOAD_COLUMN_TYPES = ["date", "varchar", "varchar", "varchar", "varchar", "varchar", "int4", "bool", "int4"]
+
+SOURCE_COLUMN_DTYPES = {
+    "trans_date_trans_time": "string",
+    "merchant": "string",
+    "category": "string",
+    "gender": "string",
+    "state": "string",
+    "job": "string",
+    "dob": "string",
+    "is_fraud": "int8",
+}
+
+# index name suffix -> index definition on the usual filter columns, built after bulk loads
+TABULAR_INDEXES = {
+    "transaction_date_brin": "USING BRIN (transaction_date)",
+    "merchant_category_idx": "(merchant_category)",
+    "state_idx": "(state)",
+    "fraud_idx": "(transaction_date) WHERE fraud_flag",
+}
+
+# dimension name -> SQL expression of the dimension in the pre-aggregated rollups
+ROLLUP_DIMENSIONS = {
+    "merchant_category": "merchant_category",
+    "state": "state",
+    "job": "job",
+    "age_band": "age - age % 10",
+    "transaction_date": "transaction_date",
+}
+
+
+def get_rollup_table_names() -> list[str]:
+    """Get the names of the rollup materialized views of the tabular table.
+
+    Returns:
+        list[str]: The rollup names, empty when rollups are disabled.
+    """
+    if not app_config.tabular_rollups_enabled:
+        return []
+    return [f"{app_config.tabular_table_name}_by_{dimension}" for dimension in ROLLUP_DIMENSIONS]
+
+
+def get_parquet_dir() -> Path:
+    """Get the directory holding the Parquet parts of the tabular table, read by the DuckDB backend.
+
+    Returns:
+        Path: The directory, one Parquet file per ingested row batch.
+    """
+    return Path(app_config.tabular_parquet_dir) / app_config.tabular_table_name
+
+
+def get_rollup_query(dimension: str) -> str:
+    """Build the aggregate query of a rollup, valid in both Postgres and DuckDB.
+
+    Args:
+        dimension (str): The rollup dimension, a key of `ROLLUP_DIMENSIONS`.
+
+    Returns:
+        str: The SELECT statement of the rollup.
+    """
+    return f"""
+        SELECT
+            {ROLLUP_DIMENSIONS[dimension]} AS {dimension},
+            COUNT(*) AS transaction_count,
+            COUNT(*) FILTER (WHERE fraud_flag) AS fraud_count,
+            ROUND(AVG(fraud_flag::int), 6) AS fraud_rate
+        FROM {app_config.tabular_table_name}
+        GROUP BY 1
+    """
+
+
+def get_rollup_description(dimension: str) -> str:
+    """Describe a rollup for the SQL generation prompt.
+
+    Args:
+        dimension (str): The rollup dimension, a key of `ROLLUP_DIMENSIONS`.
+
+    Returns:
+        str: The description, stored as the comment of the rollup.
+    """
+    table = app_config.tabular_table_name
+    return (
+        f"Pre-aggregated transaction_count, fraud_count and fraud_rate of {table} by {dimension}"
+        + (" (lower bound of 10-year age bands)" if dimension == "age_band" else "")
+        + f". Prefer it over {table} for aggregates by {dimension}."
+    )
+
+
+@dataclass
+class LoadProgress:
+    method: LoadMethodEnum
+    rows: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def add(self, rows: int) -> None:
+        """Record loaded rows and report the load rate so far.
+
+        Args:
+            rows (int): Number of rows just loaded.
+        """
+        self.rows += rows
+        elapsed = time.perf_counter() - self.started_at
+        print(f"Loaded {self.rows} rows with {self.method.value} ({self.rows / max(elapsed, 1e-9):,.0f} rows/sec)")
 
 
 class TabularDataService:
 
     def __init__(self, db: Database):
         self._db = db
+        self._manifest = ManifestService(db)
 
-    def _transform(self) -> pd.DataFrame:
-        """Transform data.
+    def _transform_chunk(self, df: pd.DataFrame, current_year: int) -> pd.DataFrame:
+        """Transform a frame of raw rows in place.
+
+        Args:
+            df (pd.DataFrame): Raw rows read with the source columns only.
+            current_year (int): The year used to derive the age.
 
         Returns:
             pd.DataFrame: Transformed DataFrame.
         """
-        df = pd.read_csv(app_config.tabular_filename)
-
-        transformed_df = df.copy()
-        
         # transform
 
-        transformed_df["transaction_date"] = pd.to_datetime(transformed_df["trans_date_trans_time"]).dt.strftime("%Y-%m-%d")    
-        transformed_df["gender"] = transformed_df["gender"].map({"M": "male", "F": "female"})
-        transformed_df["job"] = transformed_df["job"].str.lower().str.strip()
+        df["transaction_date"] = pd.to_datetime(df["trans_date_trans_time"]).dt.date
+        df["gender"] = df["gender"].map({"M": "male", "F": "female"})
+        df["job"] = df["job"].str.lower().str.strip()
+        df["age"] = current_year - pd.to_datetime(df["dob"]).dt.year
+        df["fraud_flag"] = df["is_fraud"].map({0: False, 1: True})
 
-        current_year = datetime.now().year
-        transformed_df["dob"] = pd.to_datetime(transformed_df["dob"])
-        transformed_df["age"] = current_year - transformed_df["dob"].dt.year
-        transformed_df = transformed_df.drop("dob", axis=1)
-        
-        transformed_df["fraud_flag"] = transformed_df["is_fraud"].map({0: False, 1: True})
-        
         # select the column that will be used
 
-        transformed_df = transformed_df.rename(columns={
+        df = df.rename(columns={
             "category": "merchant_category",
         })
-        
-        columns_to_select = ["transaction_date", "merchant", "merchant_category", "gender", "state", "job", "age", "fraud_flag"]
-        
-        return transformed_df[columns_to_select]
+
+        return df[TABULAR_COLUMNS]
+
+    def _read_csv(self, **kwargs) -> pd.DataFrame | TextFileReader:
+        """Read the source CSV restricted to the columns the transform needs.
+
+        Returns:
+            pd.DataFrame | TextFileReader: The frame, or a chunk reader when chunksize is given.
+        """
+        return pd.read_csv(
+            app_config.tabular_filename,
+            usecols=list(SOURCE_COLUMN_DTYPES),
+            dtype=SOURCE_COLUMN_DTYPES,
+            **kwargs,
+        )
+
+    def _transform(self) -> pd.DataFrame:
+        """Transform data.
+
+        Returns:
+            pd.DataFrame: Transformed DataFrame.
+        """
+        return self._transform_chunk(self._read_csv(), datetime.now().year)
+
+    def _iter_transformed_chunks(self) -> Iterator[pd.DataFrame]:
+        """Read and transform the CSV file chunk by chunk.
+
+        Yields:
+            pd.DataFrame: Transformed chunk of at most `tabular_stream_chunk_size` rows,
+                or the whole file when streaming is disabled.
+        """
+        if app_config.tabular_stream_chunk_size <= 0:
+            yield self._transform()
+            return
+
+        current_year = datetime.now().year
+        with self._read_csv(chunksize=app_config.tabular_stream_chunk_size) as reader:
+            for chunk in reader:
+                yield self._transform_chunk(chunk, current_year)
 
     async def _create_table(self) -> None:
-        """Create the table if it doesn't exist.
+        """Create the table if it doesn't exist, range partitioned by month of `transaction_date` when configured.
+
+        A table left with the other layout by a previous run is dropped together with its manifest,
+        so the next load rebuilds it from scratch.
         """
+        table = app_config.tabular_table_name
+        partitioned = app_config.tabular_partition_by_date
+
         async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+            row = await cursor.fetchone()
+            if row is not None and (row[0] == "p") != partitioned:
+                print(f"Table {table} has another partitioning layout, dropping it for a full rebuild.")
+                await cursor.execute(f"DROP TABLE {table} CASCADE")
+                await db_conn.commit()
+                await self._manifest.aupdate(table, upserts={}, deletes=[], replace=True)
+
+            # the partition key must be part of the primary key of a partitioned table
             await cursor.execute(
                 f"""
-                CREATE TABLE IF NOT EXISTS {app_config.tabular_table_name} (
-                    id SERIAL PRIMARY KEY,
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id SERIAL,
                     transaction_date DATE NOT NULL,
                     merchant VARCHAR(255) NOT NULL,
                     merchant_category VARCHAR(255) NOT NULL,
@@ -59,34 +224,292 @@ class TabularDataService:
                     state VARCHAR(50) NOT NULL,
                     job VARCHAR(255) NOT NULL,
                     age INTEGER NOT NULL,
-                    fraud_flag BOOLEAN NOT NULL
-                )
+                    fraud_flag BOOLEAN NOT NULL,
+                    ingest_batch INTEGER,
+                    {"PRIMARY KEY (id, transaction_date)" if partitioned else "PRIMARY KEY (id)"}
+                ){" PARTITION BY RANGE (transaction_date)" if partitioned else ""}
                 """
             )
+            await cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS ingest_batch INTEGER")
+            await cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_ingest_batch_idx ON {table} (ingest_batch)")
             await db_conn.commit()
 
-    async def _load(self) -> None:
-        """Load transformed data to database.
+    async def _create_partitions(self, cursor: AsyncCursor, chunk: pd.DataFrame) -> None:
+        """Create the monthly partitions the rows of a chunk fall into.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+            chunk (pd.DataFrame): The transformed rows about to be written.
         """
-        transformed_df = self._transform()
-        
-        data = [tuple(row) for row in transformed_df.values]
-        
-        if not data:
-            raise ValueError("No data to insert into database.")
-        
-        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
-            await cursor.executemany(
+        table = app_config.tabular_table_name
+        months = pd.to_datetime(chunk["transaction_date"]).dt.to_period("M").unique()
+        for month in sorted(months):
+            start = month.start_time.date()
+            end = (month + 1).start_time.date()
+            await cursor.execute(
                 f"""
-                INSERT INTO {app_config.tabular_table_name} (transaction_date, merchant, merchant_category, gender, state, job, age, fraud_flag)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                data,
+                CREATE TABLE IF NOT EXISTS {table}_p{month.strftime("%Y%m")}
+                PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')
+                """
             )
+
+    async def _drop_indexes(self, cursor: AsyncCursor) -> None:
+        """Drop the filter indexes, so a full rebuild doesn't maintain them row by row.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+        """
+        for suffix in TABULAR_INDEXES:
+            await cursor.execute(f"DROP INDEX IF EXISTS {app_config.tabular_table_name}_{suffix}")
+
+    async def _create_indexes(self, analyze: bool) -> None:
+        """Build the missing filter indexes.
+
+        Args:
+            analyze (bool): Whether to refresh the planner statistics, e.g. after a data change.
+        """
+        table = app_config.tabular_table_name
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            for suffix, definition in TABULAR_INDEXES.items():
+                await cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_{suffix} ON {table} {definition}")
+            if analyze:
+                await cursor.execute(f"ANALYZE {table}")
+            await db_conn.commit()
+
+    async def _copy_batch(self, cursor: AsyncCursor, batch_df: pd.DataFrame) -> None:
+        """Stream a batch of rows into the table with COPY FROM STDIN.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+            batch_df (pd.DataFrame): The rows to copy.
+        """
+        columns = ", ".join(LOAD_COLUMNS)
+        binary = app_config.tabular_copy_format == CopyFormatEnum.BINARY
+        statement = f"COPY {app_config.tabular_table_name} ({columns}) FROM STDIN"
+        if binary:
+            statement += " (FORMAT BINARY)"
+
+        async with cursor.copy(statement) as copy:
+            if binary:
+                copy.set_types(LOAD_COLUMN_TYPES)
+            for row in batch_df.itertuples(index=False, name=None):
+                await copy.write_row(row)
+
+    async def _executemany_batch(self, cursor: AsyncCursor, batch_df: pd.DataFrame) -> None:
+        """Insert a batch of rows with a parameterized INSERT, used when COPY is unavailable.
+
+        Args:
+            cursor (AsyncCursor): The cursor of the open transaction.
+            batch_df (pd.DataFrame): The rows to insert.
+        """
+        columns = ", ".join(LOAD_COLUMNS)
+        placeholders = ", ".join(["%s"] * len(LOAD_COLUMNS))
+        await cursor.executemany(
+            f"""
+            INSERT INTO {app_config.tabular_table_name} ({columns})
+            VALUES ({placeholders})
+            """,
+            list(batch_df.itertuples(index=False, name=None)),
+        )
+
+    async def _write_batches(
+        self,
+        db_conn: AsyncConnection,
+        cursor: AsyncCursor,
+        transformed_df: pd.DataFrame,
+        progress: LoadProgress,
+    ) -> None:
+        """Write the DataFrame in bounded batches, falling back to executemany if COPY is rejected.
+
+        Args:
+            db_conn (AsyncConnection): The connection of the open transaction.
+            cursor (AsyncCursor): The cursor of the open transaction.
+            transformed_df (pd.DataFrame): The rows to write.
+            progress (LoadProgress): The progress of the running load.
+        """
+        batch_size = max(app_config.tabular_load_batch_size, 1)
+
+        for start in range(0, len(transformed_df), batch_size):
+            batch_df = transformed_df.iloc[start:start + batch_size]
+
+            if progress.method == LoadMethodEnum.COPY:
+                try:
+                    async with db_conn.transaction():
+                        await self._copy_batch(cursor, batch_df)
+                except FeatureNotSupported as e:
+                    print(f"COPY is not supported by the server, falling back to executemany: {e}")
+                    progress.method = LoadMethodEnum.EXECUTEMANY
+
+            if progress.method == LoadMethodEnum.EXECUTEMANY:
+                await self._executemany_batch(cursor, batch_df)
+
+            progress.add(len(batch_df))
+
+    def _hash_chunk(self, chunk: pd.DataFrame) -> str:
+        """Hash the content of a transformed chunk.
+
+        Args:
+            chunk (pd.DataFrame): The transformed chunk.
+
+        Returns:
+            str: Hex digest of the chunk content.
+        """
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+    def _parquet_path(self, batch_index: int) -> Path:
+        return get_parquet_dir() / f"batch-{batch_index}.parquet"
+
+    def _parquet_is_missing(self, manifest: dict[str, str]) -> bool:
+        """Check whether the DuckDB backend lacks Parquet parts of ingested batches.
+
+        Args:
+            manifest (dict[str, str]): The stored hashes of the tabular source.
+
+        Returns:
+            bool: Whether Parquet parts have to be written.
+        """
+        if app_config.tabular_query_backend != QueryBackendEnum.DUCKDB:
+            return False
+        return any(
+            not self._parquet_path(int(key.removeprefix("batch-"))).exists()
+            for key in manifest
+            if key != FILE_KEY
+        )
+
+    async def _load(self) -> bool:
+        """Load the CSV file chunk by chunk, parsing the next chunk while the current one is written.
+
+        Each chunk is a row batch tracked in the manifest: unchanged batches are skipped, changed
+        batches are replaced and batches that vanished from the file are deleted. With the DuckDB
+        query backend, every batch is also written to its own Parquet part.
+
+        Batches are keyed by position, so the file is assumed to be append-only: appended rows only
+        touch the last batches, while inserting or deleting a row near the top shifts every later
+        batch and reloads almost the whole file.
+
+        Returns:
+            bool: Whether the table content changed.
+        """
+        source = app_config.tabular_table_name
+        # the batch boundaries depend on the chunk size, so it is part of the fingerprint
+        file_hash = text_sha256(f"{file_sha256(app_config.tabular_filename)}:{app_config.tabular_stream_chunk_size}")
+
+        manifest = await self._manifest.aget_hashes(source) if app_config.ingestion_incremental else {}
+        export_parquet = app_config.tabular_query_backend == QueryBackendEnum.DUCKDB
+        if manifest.get(FILE_KEY) == file_hash and not self._parquet_is_missing(manifest):
+            print(f"CSV {app_config.tabular_filename} is unchanged, skipping.")
+            return False
+
+        # without a manifest the table content is unknown, so it is rebuilt from scratch
+        full_rebuild = not manifest
+        if export_parquet:
+            get_parquet_dir().mkdir(parents=True, exist_ok=True)
+            if full_rebuild:
+                for part in get_parquet_dir().glob("*.parquet"):
+                    part.unlink()
+
+        chunks = self._iter_transformed_chunks()
+        next_chunk = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+
+        progress = LoadProgress(method=app_config.tabular_load_method)
+        hashes = {}
+        changed_keys = []
+        try:
+            async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+                if full_rebuild:
+                    await self._drop_indexes(cursor)
+                    await cursor.execute(f"TRUNCATE {app_config.tabular_table_name} RESTART IDENTITY")
+
+                batch_index = 0
+                while (chunk := await next_chunk) is not None:
+                    next_chunk = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+
+                    key = f"batch-{batch_index}"
+                    hashes[key] = self._hash_chunk(chunk)
+                    changed = is_changed(manifest, key, hashes[key])
+                    if changed:
+                        # also when the key is not in the manifest: a run that crashed after the
+                        # commit but before the manifest update may have written the batch already
+                        if not full_rebuild:
+                            await cursor.execute(
+                                f"DELETE FROM {app_config.tabular_table_name} WHERE ingest_batch = %s",
+                                (batch_index,),
+                            )
+                        if app_config.tabular_partition_by_date:
+                            await self._create_partitions(cursor, chunk)
+                        await self._write_batches(db_conn, cursor, chunk.assign(ingest_batch=batch_index), progress)
+                        changed_keys.append(key)
+
+                    parquet_path = self._parquet_path(batch_index)
+                    if export_parquet and (changed or not parquet_path.exists()):
+                        await asyncio.to_thread(chunk.to_parquet, parquet_path, index=False)
+                    batch_index += 1
+
+                if not hashes:
+                    raise ValueError("No data to insert into database.")
+
+                vanished_keys = get_vanished_keys(manifest, hashes)
+                if vanished_keys:
+                    await cursor.execute(
+                        f"DELETE FROM {app_config.tabular_table_name} WHERE ingest_batch = ANY(%s)",
+                        ([int(key.removeprefix("batch-")) for key in vanished_keys],),
+                    )
+                    for key in vanished_keys:
+                        self._parquet_path(int(key.removeprefix("batch-"))).unlink(missing_ok=True)
+                await db_conn.commit()
+        finally:
+            await asyncio.gather(next_chunk, return_exceptions=True)
+            chunks.close()
+
+        print(f"CSV {app_config.tabular_filename}: {len(changed_keys)} batches upserted, {len(hashes) - len(changed_keys)} unchanged, {len(vanished_keys)} deleted.")
+        metrics.increment("ingested_items_total", progress.rows, source=source)
+
+        await self._manifest.aupdate(
+            source,
+            upserts={key: hashes[key] for key in changed_keys} | {FILE_KEY: file_hash},
+            deletes=vanished_keys,
+            replace=full_rebuild,
+        )
+
+        return bool(changed_keys or vanished_keys)
+
+    async def _build_rollups(self, refresh: bool) -> None:
+        """Create the rollup materialized views if they don't exist, and refresh them after a data change.
+
+        Each rollup holds transaction counts, fraud counts and fraud rates per value of one common
+        dimension, so aggregate questions read a few hundred rows instead of the raw table.
+
+        Args:
+            refresh (bool): Whether the raw table changed since the rollups were last refreshed.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            for dimension, rollup in zip(ROLLUP_DIMENSIONS, get_rollup_table_names()):
+                await cursor.execute("SELECT to_regclass(%s)", (rollup,))
+                exists = (await cursor.fetchone())[0] is not None
+
+                if not exists:
+                    await cursor.execute(f"CREATE MATERIALIZED VIEW {rollup} AS {get_rollup_query(dimension)}")
+                    # the unique index allows refreshing without blocking readers
+                    await cursor.execute(f"CREATE UNIQUE INDEX {rollup}_{dimension}_idx ON {rollup} ({dimension})")
+                    await cursor.execute(f"COMMENT ON MATERIALIZED VIEW {rollup} IS '{get_rollup_description(dimension)}'")
+                    print(f"Created rollup {rollup}.")
+                elif refresh:
+                    await cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {rollup}")
+                    print(f"Refreshed rollup {rollup}.")
+
             await db_conn.commit()
                 
     async def process(self) -> None:
-        """Process the tabular data by creating table, transforming and loading it into the database.
+        """Process the tabular data by creating table, transforming and loading it into the database, then building the indexes and refreshing the rollups.
         """
+        await self._manifest.setup()
         await self._create_table()
-        await self._load()
\ No newline at end of file
+        with metrics.span("tabular_load"):
+            changed = await self._load()
+        if app_config.tabular_indexes_enabled:
+            with metrics.span("tabular_indexes"):
+                await self._create_indexes(analyze=changed)
+        if app_config.tabular_rollups_enabled:
+            with metrics.span("tabular_rollups"):
+                await self._build_rollups(refresh=changed)
\ No newline at end of file
@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from langchain_postgres import PGVectorStore
+from langchain_postgres.v2.indexes import (
+    DEFAULT_INDEX_NAME_SUFFIX,
+    BaseIndex,
+    HNSWIndex,
+    HNSWQueryOptions,
+    IVFFlatIndex,
+    IVFFlatQueryOptions,
+    QueryOptions,
+)
+
+from src.core.config import app_config
+from src.database import Database
+from src.modules.const.enum import VectorIndexEnum
+
+
+# pgvector builds HNSW and IVFFlat indexes on `vector` columns of up to 2000 dimensions and on
+# `halfvec` columns of up to 4000
+MAX_VECTOR_INDEX_DIMENSION = 2000
+MAX_HALFVEC_INDEX_DIMENSION = 4000
+
+
+def get_vector_type(dimension: int) -> str:
+    """Get the pgvector column type for embeddings of the given dimension.
+
+    Embeddings too wide to index as `vector` are stored as `halfvec`, which can be indexed up to
+    4000 dimensions and takes half the space, at a precision loss that doesn't affect the ranking.
+
+    Args:
+        dimension (int): The embedding dimension.
+
+    Returns:
+        str: The column type, e.g. `vector(768)` or `halfvec(2048)`.
+    """
+    if MAX_VECTOR_INDEX_DIMENSION < dimension <= MAX_HALFVEC_INDEX_DIMENSION:
+        return f"halfvec({dimension})"
+    return f"vector({dimension})"
+
+
+def is_indexable(dimension: int) -> bool:
+    return dimension <= MAX_HALFVEC_INDEX_DIMENSION
+
+
+@dataclass
+class HalfvecHNSWIndex(HNSWIndex):
+    def get_index_function(self) -> str:
+        return self.distance_strategy.index_function.replace("vector_", "halfvec_", 1)
+
+
+@dataclass
+class HalfvecIVFFlatIndex(IVFFlatIndex):
+    def get_index_function(self) -> str:
+        return self.distance_strategy.index_function.replace("vector_", "halfvec_", 1)
+
+
+def get_vector_index() -> BaseIndex | None:
+    """Build the ANN index definition selected by the configuration.
+
+    Returns:
+        BaseIndex | None: The index definition, or None when exact search is configured.
+    """
+    halfvec = get_vector_type(app_config.embedding_dimension).startswith("halfvec")
+    if app_config.pdf_vector_index_type == VectorIndexEnum.HNSW:
+        index_class = HalfvecHNSWIndex if halfvec else HNSWIndex
+        return index_class(
+            m=app_config.pdf_vector_hnsw_m,
+            ef_construction=app_config.pdf_vector_hnsw_ef_construction,
+        )
+    if app_config.pdf_vector_index_type == VectorIndexEnum.IVFFLAT:
+        index_class = HalfvecIVFFlatIndex if halfvec else IVFFlatIndex
+        return index_class(lists=app_config.pdf_vector_ivfflat_lists)
+    return None
+
+
+def get_vector_index_query_options() -> QueryOptions | None:
+    """Build the query-time options matching the configured ANN index.
+
+    Returns:
+        QueryOptions | None: `hnsw.ef_search` or `ivfflat.probes` options, or None for exact search.
+    """
+    if app_config.pdf_vector_index_type == VectorIndexEnum.HNSW:
+        return HNSWQueryOptions(ef_search=app_config.pdf_vector_hnsw_ef_search)
+    if app_config.pdf_vector_index_type == VectorIndexEnum.IVFFLAT:
+        return IVFFlatQueryOptions(probes=app_config.pdf_vector_ivfflat_probes)
+    return None
+
+
+class VectorIndexService:
+    """Build, rebuild and drop the ANN index of the PDF vector table.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._index_name = app_config.pdf_vector_table_name + DEFAULT_INDEX_NAME_SUFFIX
+
+    async def _aget_index_method(self) -> str | None:
+        """Get the access method of the existing vector index.
+
+        Returns:
+            str | None: `hnsw` or `ivfflat`, or None when the index doesn't exist.
+        """
+        async with self._db.get_postgres_db() as db_conn, db_conn.cursor() as cursor:
+            await cursor.execute(
+                """
+                SELECT am.amname
+                FROM pg_class c
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE c.relname = %s AND c.relkind = 'i'
+                """,
+                (self._index_name,),
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def aensure_index(self, store: PGVectorStore, reindex: bool = False) -> None:
+        """Create the configured index if it is missing or of another type, otherwise optionally reindex it.
+
+        Args:
+            store (PGVectorStore): The vector store of the PDF table.
+            reindex (bool, optional): Whether to rebuild an existing index, e.g. after incremental
+                ingestion left IVFFlat centroids stale. Defaults to False.
+        """
+        index = get_vector_index()
+        current_method = await self._aget_index_method()
+
+        if index is None:
+            if current_method is not None:
+                await store.adrop_vector_index(self._index_name)
+                print(f"Dropped vector index {self._index_name}, searches are exact.")
+            return
+
+        if not is_indexable(app_config.embedding_dimension):
+            print(
+                f"Skipping vector index: pgvector cannot index {app_config.embedding_dimension}-dimensional vectors "
+                f"(max {MAX_HALFVEC_INDEX_DIMENSION}). Lower EMBEDDING_DIMENSION with a model that supports it."
+            )
+            return
+
+        if current_method == index.index_type:
+            if reindex:
+                await store.areindex(self._index_name)
+                print(f"Reindexed vector index {self._index_name}.")
+            return
+
+        if current_method is not None:
+            await store.adrop_vector_index(self._index_name)
+
+        await store.aapply_vector_index(index, name=self._index_name)
+        print(f"Built {index.index_type} vector index {self._index_name} with {index.index_options()}.")
+
+    async def arebuild(self, store: PGVectorStore) -> None:
+        """Drop and build the configured index from scratch.
+
+        Args:
+            store (PGVectorStore): The vector store of the PDF table.
+        """
+        await store.adrop_vector_index(self._index_name)
+        await self.aensure_index(store)
@@ -1,11 +1,8 @@
-from pydantic import SecretStr
-
 from langchain.tools import ToolRuntime, tool
-from langchain_openai import ChatOpenAI
 from langfuse import Langfuse
 
-from src.core.config import app_config
-from src.database import Database
+from src.core.metrics import metrics
+from src.modules.services.fraud_records_service import fraud_records_service
 
 
 @tool
@@ -25,59 +22,5 @@ async def search_fraud_records(query: str, runtime: ToolRuntime) -> str:
     if not langfuse_client:
         raise ValueError("Langfuse client is not provided in the configurable.")
 
-    db = Database()
-    schema = ""
-    try:
-        async with db.get_postgres_db() as conn, conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT table_name, column_name, data_type 
-                FROM information_schema.columns 
-                WHERE table_schema = 'public' 
-                ORDER BY table_name, ordinal_position
-            """)
-            schema_rows = await cursor.fetchall()
-            
-            current_table = None
-            for row in schema_rows:
-                table_name, column_name, data_type = row
-                if current_table != table_name:
-                    schema += f"\n{table_name}:\n"
-                    current_table = table_name
-                schema += f"  - {column_name}: {data_type}\n"
-    except Exception as e:
-        return f"Failed to get schema information: {str(e)}"
-
-    prompt = langfuse_client.get_prompt(
-        "search_fraud_records",
-        label="latest",
-        cache_ttl_seconds=600,
-    )
-    compiled_prompt = prompt.compile(
-        schema=schema,
-        query=query
-    )
-
-    model = prompt.config.get("model")
-    temperature = prompt.config.get("temperature", 0.0)
-
-    llm = ChatOpenAI(
-        model=model,
-        temperature=temperature,
-        api_key=SecretStr(app_config.openrouter_api_key),
-        base_url="https://openrouter.ai/api/v1",
-    )
-
-    response = await llm.ainvoke(compiled_prompt)
-
-    sql_query = response.content.strip()
-
-    try:
-        async with db.get_postgres_db() as conn, conn.cursor() as cursor:
-            await cursor.execute(sql_query)
-            results = await cursor.fetchall()
-    except Exception as e:
-        return f"Failed to execute SQL query: {str(e)}"
-    
-    results_str = str(results)
-
-    return results_str
\ No newline at end of file
+    with metrics.span("tool", tool="search_fraud_records"):
+        return await fraud_records_service.asearch(query, langfuse_client)
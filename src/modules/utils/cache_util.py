@@ -0,0 +1,110 @@
+import time
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+def normalize_whitespace(query: str) -> str:
+    """Collapse the whitespace of a query, keeping its case.
+
+    Used where the case matters, e.g. for literals that end up in a generated SQL filter.
+
+    Args:
+        query (str): The query.
+
+    Returns:
+        str: The query with collapsed whitespace.
+    """
+    return " ".join(query.split())
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so that trivially different spellings share a cache entry.
+
+    Args:
+        query (str): The query.
+
+    Returns:
+        str: The lower-cased query with collapsed whitespace.
+    """
+    return normalize_whitespace(query.lower())
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after a time to live.
+
+    Args:
+        max_size (int): Maximum number of entries, 0 disables the cache.
+        ttl_seconds (float): Lifetime of an entry, 0 keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float = 0):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an entry and mark it as recently used.
+
+        Args:
+            key (Hashable): The entry key.
+            default (Any, optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            Any: The cached value, or the default on a miss.
+        """
+        item = self._items.get(key)
+        if item is None or (self._ttl_seconds and time.monotonic() - item[0] > self._ttl_seconds):
+            if item is not None:
+                del self._items[key]
+            self.misses += 1
+            return default
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used ones beyond the maximum size.
+
+        Args:
+            key (Hashable): The entry key.
+            value (Any): The value to cache.
+        """
+        if self._max_size <= 0:
+            return
+
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Drop an entry if it exists.
+
+        Args:
+            key (Hashable): The entry key.
+        """
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry.
+        """
+        self._items.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Get the hit and miss counters.
+
+        Returns:
+            dict[str, float]: Number of entries, hits, misses and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
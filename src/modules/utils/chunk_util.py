@@ -0,0 +1,74 @@
+from langchain_core.documents import Document
+
+
+SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+
+def _split_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """Split a text into windows of at most `chunk_size` characters that overlap by `chunk_overlap`.
+
+    Windows end on the strongest separator found in their second half, so paragraphs and
+    sentences are kept together whenever possible.
+
+    Args:
+        text (str): The text to split.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Number of characters shared by consecutive chunks.
+
+    Returns:
+        list[str]: The chunks.
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            for separator in SEPARATORS:
+                cut = text.rfind(separator, start + chunk_size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if end >= len(text):
+            break
+
+        # start the next window on a word boundary inside the overlap
+        next_start = max(end - chunk_overlap, start + 1)
+        boundary = text.find(" ", next_start, end)
+        start = boundary + 1 if chunk_overlap and boundary != -1 else next_start
+
+    return chunks
+
+
+def chunk_documents(docs: list[Document], chunk_size: int, chunk_overlap: int) -> list[Document]:
+    """Split documents into size-bounded chunks, keeping their metadata.
+
+    Args:
+        docs (list[Document]): The documents to split, typically one per PDF page.
+        chunk_size (int): Maximum number of characters per chunk, 0 keeps the documents whole.
+        chunk_overlap (int): Number of characters shared by consecutive chunks.
+
+    Returns:
+        list[Document]: The chunks, with a `chunk` index added to the metadata of their document.
+    """
+    chunk_overlap = min(max(chunk_overlap, 0), chunk_size // 2)
+
+    chunked_docs = []
+    for doc in docs:
+        texts = _split_text(doc.page_content, chunk_size, chunk_overlap) if chunk_size > 0 else [doc.page_content]
+        for index, text in enumerate(texts):
+            chunked_docs.append(
+                Document(
+                    page_content=text,
+                    metadata={
+                        **doc.metadata,
+                        "chunk": index,
+                    },
+                )
+            )
+
+    return chunked_docs
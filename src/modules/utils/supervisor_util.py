@@ -1,16 +1,17 @@
 from langchain_core.documents import Document
 
 
-def format_conversation_history(messages: list) -> str:
+def format_conversation_history(messages: list, summary: str = "") -> str:
     """Format the conversation history from a list of messages.
 
     Args:
         messages (list): List of messages in the conversation.
+        summary (str, optional): Summary of the earlier messages no longer in the list. Defaults to "".
 
     Returns:
         str: Formatted conversation history.
     """
-    formatted = []
+    formatted = [f"## Summary of the earlier conversation\n{summary}"] if summary else []
     for msg in messages:
         if msg.content and msg.__class__.__name__ in ["HumanMessage", "AIMessage"]:
             role = "## User" if msg.__class__.__name__ == "HumanMessage" else "## AI Assistant"
@@ -19,6 +20,25 @@ def format_conversation_history(messages: list) -> str:
     return "\n".join(formatted)
 
 
+def format_retrieval_context(context: dict[str, str]) -> str:
+    """Format the prefetched retrieval results for inclusion in the prompt.
+
+    Args:
+        context (dict[str, str]): The results by tool name.
+
+    Returns:
+        str: Formatted retrieval results, empty when there are none.
+    """
+    if not context:
+        return ""
+
+    formatted = ["## Retrieved Context"]
+    for tool_name, result in sorted(context.items()):
+        formatted.append(f"### {tool_name}\n{result}")
+
+    return "\n".join(formatted)
+
+
 def format_pdf_search_results(responses: list[Document]) -> str:
     """Format the PDF search responses for inclusion in the prompt.
 
@@ -35,4 +55,40 @@ def format_pdf_search_results(responses: list[Document]) -> str:
         content = result.page_content
         formatted_results += f"{content}\n"
 
-    return formatted_results
\ No newline at end of file
+    return formatted_results
+
+
+def format_sql_row(row: tuple) -> str:
+    """Render a SQL result row as a pipe-separated line.
+
+    Args:
+        row (tuple): The row values.
+
+    Returns:
+        str: The rendered row, with NULL rendered as an empty cell.
+    """
+    return " | ".join("" if value is None else str(value) for value in row)
+
+
+def format_sql_results(columns: list[str], rows: list[str], truncated: bool) -> str:
+    """Format the SQL search results as a compact table for inclusion in the prompt.
+
+    Args:
+        columns (list[str]): The column names.
+        rows (list[str]): The rows rendered with `format_sql_row`.
+        truncated (bool): Whether rows were left out because the result cap was hit.
+
+    Returns:
+        str: Formatted SQL search results.
+    """
+    if not rows and not truncated:
+        return "No rows returned."
+
+    formatted_results = "\n".join([" | ".join(columns), *rows])
+    if truncated and not rows:
+        # rows exist, but even the first one is over the size cap
+        formatted_results += "\n... truncated before the first row, it exceeds the result size cap. Select fewer or shorter columns."
+    elif truncated:
+        formatted_results += f"\n... truncated after {len(rows)} rows, refine the query with filters, aggregates or a LIMIT."
+
+    return formatted_results
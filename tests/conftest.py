@@ -0,0 +1,47 @@
+import os
+import psycopg
+import pytest
+
+
+# the settings are read on import; the unit tests never connect to any of these services
+TEST_ENVIRONMENT = {
+    "PDF_FILENAME": "test.pdf",
+    "TABULAR_FILENAME": "test.csv",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASS": "postgres",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "postgres",
+    "POSTGRES_TIMEOUT": "5",
+    "PDF_VECTOR_TABLE_NAME": "pdf_contents",
+    "TABULAR_TABLE_NAME": "fraud_records",
+    "LANGFUSE_SECRET_KEY": "test",
+    "LANGFUSE_PUBLIC_KEY": "test",
+    "LANGFUSE_BASE_URL": "http://localhost",
+    "OPENROUTER_API_KEY": "test",
+}
+
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def postgres_conninfo() -> str:
+    """Connection string of the configured Postgres, skipping the test when it isn't reachable.
+
+    Tests using it only touch temporary tables of their own session.
+    """
+    from src.core.config import app_config
+
+    conninfo = (
+        f"dbname={app_config.postgres_db} "
+        f"user={app_config.postgres_user} "
+        f"password={app_config.postgres_pass} "
+        f"host={app_config.postgres_host} "
+        f"port={app_config.postgres_port}"
+    )
+    try:
+        psycopg.connect(conninfo, connect_timeout=2).close()
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+    return conninfo
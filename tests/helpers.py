@@ -0,0 +1,21 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from psycopg import AsyncConnection
+
+from src.database import Database
+
+
+class SessionDatabase(Database):
+    """Hands out the one connection of a test, which sees the temporary tables it created.
+
+    Temporary tables shadow the regular tables of the same name, so services run against them
+    without touching the real data.
+    """
+
+    def __init__(self, conn: AsyncConnection | None = None):
+        super().__init__()
+        self._conn = conn
+
+    @asynccontextmanager
+    async def get_postgres_db(self) -> AsyncGenerator[AsyncConnection]:
+        yield self._conn
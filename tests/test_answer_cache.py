@@ -0,0 +1,195 @@
+import asyncio
+import numpy as np
+import pytest
+
+from psycopg import AsyncConnection
+
+from src.core.config import app_config
+from src.database import Database
+from src.modules.const.enum import AnswerCacheBackendEnum
+from src.modules.services import answer_cache_service as answer_cache_module
+from src.modules.services.answer_cache_service import AnswerCacheService
+from tests.helpers import SessionDatabase
+
+
+VECTORS = {
+    "how many frauds?": [1.0, 0.0, 0.0],
+    "How many frauds were there?": [0.99, 0.14, 0.0],
+    "which state has the most frauds?": [0.0, 1.0, 0.0],
+    "what is the fraud policy?": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def cache_config(monkeypatch):
+    monkeypatch.setattr(app_config, "embedding_dimension", 3)
+    monkeypatch.setattr(app_config, "answer_cache_similarity_threshold", 0.95)
+    monkeypatch.setattr(app_config, "answer_cache_max_entries", 2)
+    monkeypatch.setattr(app_config, "answer_cache_ttl_seconds", 0)
+    monkeypatch.setattr(app_config, "answer_cache_backend", AnswerCacheBackendEnum.MEMORY)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_service(db: Database | None = None) -> AnswerCacheService:
+    service = AnswerCacheService(db or SessionDatabase())
+
+    async def aembed(question: str) -> np.ndarray:
+        vector = np.asarray(VECTORS[question], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    service._aembed = aembed
+    return service
+
+
+def test_memory_lookup_matches_similar_question_of_same_version(cache_config):
+    async def scenario():
+        service = make_service()
+        await service.astore("how many frauds?", "42", "v1")
+        return (
+            await service.alookup("How many frauds were there?", "v1"),
+            await service.alookup("which state has the most frauds?", "v1"),
+        )
+
+    assert asyncio.run(scenario()) == ("42", None)
+
+
+def test_memory_lookup_misses_on_version_mismatch(cache_config):
+    async def scenario():
+        service = make_service()
+        await service.astore("how many frauds?", "42", "v1")
+        return await service.alookup("how many frauds?", "v2")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_memory_store_of_new_version_drops_older_entries(cache_config):
+    async def scenario():
+        service = make_service()
+        await service.astore("how many frauds?", "42", "v1")
+        await service.astore("what is the fraud policy?", "see page 3", "v2")
+        return await service.alookup("how many frauds?", "v1")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_memory_cache_overwrites_oldest_entry_when_full(cache_config):
+    async def scenario():
+        service = make_service()
+        for question in ["how many frauds?", "which state has the most frauds?", "what is the fraud policy?"]:
+            await service.astore(question, question.upper(), "v1")
+        return [await service.alookup(question, "v1") for question in VECTORS if question != "How many frauds were there?"]
+
+    assert asyncio.run(scenario()) == [None, "WHICH STATE HAS THE MOST FRAUDS?", "WHAT IS THE FRAUD POLICY?"]
+
+
+def test_memory_entries_expire_after_ttl(cache_config, clock, monkeypatch):
+    monkeypatch.setattr(app_config, "answer_cache_ttl_seconds", 60)
+
+    async def scenario():
+        service = make_service()
+        await service.astore("how many frauds?", "42", "v1")
+        clock[0] += 60
+        fresh = await service.alookup("how many frauds?", "v1")
+        clock[0] += 1
+        return fresh, await service.alookup("how many frauds?", "v1")
+
+    assert asyncio.run(scenario()) == ("42", None)
+
+
+def test_version_changes_with_data_and_prompts(cache_config, monkeypatch):
+    monkeypatch.setattr(app_config, "answer_cache_version_check_seconds", 0)
+    data_versions = {app_config.tabular_table_name: "csv-1", app_config.pdf_vector_table_name: "pdf-1"}
+
+    async def aget_data_version(source: str) -> str | None:
+        return data_versions[source]
+
+    async def scenario():
+        service = make_service()
+        service._manifest.aget_version = aget_data_version
+        versions = [await service.aget_version([1, 1]), await service.aget_version([1, 1]), await service.aget_version([2, 1])]
+        data_versions[app_config.tabular_table_name] = "csv-2"
+        versions.append(await service.aget_version([1, 1]))
+        data_versions[app_config.pdf_vector_table_name] = None
+        versions.append(await service.aget_version([1, 1]))
+        return versions
+
+    first, same, new_prompt, new_data, not_ingested = asyncio.run(scenario())
+
+    assert first == same
+    assert len({first, new_prompt, new_data}) == 3
+    assert not_ingested is None
+
+
+async def apostgres_scenario(conninfo: str, steps) -> list:
+    async with await AsyncConnection.connect(conninfo) as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT to_regtype('vector') IS NOT NULL")
+            if not (await cursor.fetchone())[0]:
+                pytest.skip("pgvector is not installed")
+        await conn.execute(
+            f"""
+            CREATE TEMPORARY TABLE {app_config.answer_cache_table_name} (
+                id BIGSERIAL PRIMARY KEY,
+                version VARCHAR(16) NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                embedding vector(3) NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        await conn.commit()
+        return await steps(conn, make_service(SessionDatabase(conn)))
+
+
+@pytest.fixture
+def postgres_cache(cache_config, monkeypatch, postgres_conninfo):
+    monkeypatch.setattr(app_config, "answer_cache_backend", AnswerCacheBackendEnum.POSTGRES)
+    monkeypatch.setattr(app_config, "answer_cache_table_name", "test_answer_cache")
+    return postgres_conninfo
+
+
+def test_postgres_lookup_filters_by_version(postgres_cache):
+    async def steps(conn, service):
+        await service.astore("how many frauds?", "42", "v1")
+        return [
+            await service.alookup("How many frauds were there?", "v1"),
+            await service.alookup("how many frauds?", "v2"),
+        ]
+
+    assert asyncio.run(apostgres_scenario(postgres_cache, steps)) == ["42", None]
+
+
+def test_postgres_trim_keeps_newest_entries_of_every_version(postgres_cache):
+    async def steps(conn, service):
+        await service.astore("how many frauds?", "42", "v1")
+        await service.astore("which state has the most frauds?", "Texas", "v2")
+        await service.astore("what is the fraud policy?", "see page 3", "v1")
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT version, answer FROM test_answer_cache ORDER BY id")
+            return await cursor.fetchall()
+
+    assert asyncio.run(apostgres_scenario(postgres_cache, steps)) == [("v2", "Texas"), ("v1", "see page 3")]
+
+
+def test_postgres_trim_drops_expired_entries(postgres_cache, monkeypatch):
+    monkeypatch.setattr(app_config, "answer_cache_ttl_seconds", 60)
+    monkeypatch.setattr(app_config, "answer_cache_max_entries", 10)
+
+    async def steps(conn, service):
+        await service.astore("how many frauds?", "42", "v1")
+        await conn.execute("UPDATE test_answer_cache SET created_at = now() - interval '2 minutes'")
+        await conn.commit()
+        expired = await service.alookup("how many frauds?", "v1")
+        await service.astore("what is the fraud policy?", "see page 3", "v1")
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT answer FROM test_answer_cache ORDER BY id")
+            return expired, await cursor.fetchall()
+
+    assert asyncio.run(apostgres_scenario(postgres_cache, steps)) == (None, [("see page 3",)])
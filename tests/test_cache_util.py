@@ -0,0 +1,98 @@
+import pytest
+
+from src.modules.utils import cache_util
+from src.modules.utils.cache_util import TTLCache, normalize_query, normalize_whitespace
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_util.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_normalize_query_lowercases_and_collapses_whitespace():
+    assert normalize_query("  How MANY\tfrauds \n in 2020? ") == "how many frauds in 2020?"
+
+
+def test_normalize_whitespace_keeps_case():
+    assert normalize_whitespace("  merchant  =\n'ACME' ") == "merchant = 'ACME'"
+
+
+def test_get_returns_default_on_miss():
+    cache = TTLCache(max_size=2)
+
+    assert cache.get("missing", "default") == "default"
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("key", "value")
+
+    clock[0] += 10
+    assert cache.get("key") == "value"
+
+    clock[0] += 0.1
+    assert cache.get("key") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_ttl_keeps_entries_until_evicted(clock):
+    cache = TTLCache(max_size=2, ttl_seconds=0)
+    cache.set("key", "value")
+
+    clock[0] += 10 ** 9
+    assert cache.get("key") == "value"
+
+
+def test_set_refreshes_the_ttl(clock):
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("key", "old")
+    clock[0] += 8
+    cache.set("key", "new")
+
+    clock[0] += 8
+    assert cache.get("key") == "new"
+
+
+def test_evicts_least_recently_used_entry():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_overwriting_an_entry_marks_it_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_zero_max_size_disables_the_cache():
+    cache = TTLCache(max_size=0)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(max_size=2)
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("missing")
+
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from datetime import datetime, timedelta, timezone
+from psycopg import AsyncConnection
+
+from src.modules.services.checkpoint_service import CheckpointService
+from tests.helpers import SessionDatabase
+
+
+# temporary tables shadow the real checkpoint tables for the session that creates them
+CREATE_TABLES_SQL = """
+    CREATE TEMPORARY TABLE checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        checkpoint JSONB NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    );
+    CREATE TEMPORARY TABLE checkpoint_writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL
+    );
+    CREATE TEMPORARY TABLE checkpoint_blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL
+    );
+"""
+
+
+async def add_checkpoint(conn: AsyncConnection, thread_id: str, checkpoint_id: str, age: timedelta, versions: dict[str, str]) -> None:
+    checkpoint = {"ts": (datetime.now(timezone.utc) - age).isoformat(), "channel_versions": versions}
+    await conn.execute(
+        "INSERT INTO checkpoints (thread_id, checkpoint_id, checkpoint) VALUES (%s, %s, %s)",
+        (thread_id, checkpoint_id, json.dumps(checkpoint)),
+    )
+    await conn.execute(
+        "INSERT INTO checkpoint_writes (thread_id, checkpoint_id, task_id, idx) VALUES (%s, %s, 'task', 0)",
+        (thread_id, checkpoint_id),
+    )
+
+
+async def aprune(conninfo: str, **kwargs) -> tuple[dict[str, int], list[tuple], list[tuple], list[tuple]]:
+    """Prune a fixture of two threads and get the counts and the rows left behind."""
+    async with await AsyncConnection.connect(conninfo) as conn:
+        await conn.execute(CREATE_TABLES_SQL)
+        # thread-a has four checkpoints, the two oldest of them a day old; thread-b has one fresh
+        for index, age in enumerate([timedelta(days=1), timedelta(days=1), timedelta(0), timedelta(0)]):
+            await add_checkpoint(conn, "thread-a", f"a-{index}", age, {"messages": f"v{index}"})
+        await add_checkpoint(conn, "thread-b", "b-0", timedelta(0), {"messages": "v0"})
+        for thread_id, version in [("thread-a", "v0"), ("thread-a", "v3"), ("thread-b", "v0"), ("thread-b", "v9")]:
+            await conn.execute(
+                "INSERT INTO checkpoint_blobs (thread_id, channel, version) VALUES (%s, 'messages', %s)",
+                (thread_id, version),
+            )
+        await conn.commit()
+
+        deleted = await CheckpointService(SessionDatabase(conn)).aprune(**kwargs)
+
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT thread_id, checkpoint_id FROM checkpoints ORDER BY 1, 2")
+            checkpoints = await cursor.fetchall()
+            await cursor.execute("SELECT thread_id, checkpoint_id FROM checkpoint_writes ORDER BY 1, 2")
+            writes = await cursor.fetchall()
+            await cursor.execute("SELECT thread_id, version FROM checkpoint_blobs ORDER BY 1, 2")
+            blobs = await cursor.fetchall()
+    return deleted, checkpoints, writes, blobs
+
+
+def test_prune_keeps_newest_checkpoints_per_thread(postgres_conninfo):
+    deleted, checkpoints, writes, blobs = asyncio.run(aprune(postgres_conninfo, ttl_seconds=0, keep_per_thread=2, batch_size=1))
+
+    assert checkpoints == [("thread-a", "a-2"), ("thread-a", "a-3"), ("thread-b", "b-0")]
+    assert writes == checkpoints
+    # v0 of thread-a lost its checkpoint, v9 of thread-b never had one
+    assert blobs == [("thread-a", "v3"), ("thread-b", "v0")]
+    assert deleted == {"checkpoints": 2, "writes": 2, "blobs": 2}
+
+
+def test_prune_deletes_expired_checkpoints(postgres_conninfo):
+    deleted, checkpoints, writes, blobs = asyncio.run(aprune(postgres_conninfo, ttl_seconds=3600, keep_per_thread=0, batch_size=10))
+
+    assert checkpoints == [("thread-a", "a-2"), ("thread-a", "a-3"), ("thread-b", "b-0")]
+    assert writes == checkpoints
+    assert deleted["checkpoints"] == 2
+
+
+def test_prune_applies_ttl_and_keep_per_thread_together(postgres_conninfo):
+    deleted, checkpoints, writes, blobs = asyncio.run(aprune(postgres_conninfo, ttl_seconds=3600, keep_per_thread=1, batch_size=2))
+
+    assert checkpoints == [("thread-a", "a-3"), ("thread-b", "b-0")]
+    assert writes == checkpoints
+    assert deleted["checkpoints"] == 3
+
+
+def test_prune_without_retention_only_deletes_orphaned_blobs(postgres_conninfo):
+    deleted, checkpoints, writes, blobs = asyncio.run(aprune(postgres_conninfo, ttl_seconds=0, keep_per_thread=0))
+
+    assert len(checkpoints) == 5
+    assert ("thread-b", "v9") not in blobs
+    assert deleted == {"checkpoints": 0, "writes": 0, "blobs": 1}
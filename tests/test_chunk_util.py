@@ -0,0 +1,81 @@
+from langchain_core.documents import Document
+
+from src.modules.utils.chunk_util import _split_text, chunk_documents
+
+
+WORDS = [f"w{index}" for index in range(300)]
+TEXT = " ".join(WORDS)
+
+
+def test_split_text_respects_chunk_size():
+    chunks = _split_text(TEXT, chunk_size=50, chunk_overlap=10)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 50 for chunk in chunks)
+
+
+def test_split_text_ends_chunks_on_word_boundaries():
+    chunks = _split_text(TEXT, chunk_size=50, chunk_overlap=10)
+
+    for chunk in chunks:
+        assert all(word in WORDS for word in chunk.split(" "))
+
+
+def test_split_text_overlaps_consecutive_chunks_within_bounds():
+    chunks = _split_text(TEXT, chunk_size=50, chunk_overlap=10)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        first_word = current.split(" ")[0]
+        shared = previous[previous.rindex(first_word):]
+        assert current.startswith(shared)
+        assert 0 < len(shared) <= 10
+
+
+def test_split_text_without_overlap_keeps_every_word_once():
+    chunks = _split_text(TEXT, chunk_size=50, chunk_overlap=0)
+
+    assert " ".join(chunks).split(" ") == WORDS
+
+
+def test_split_text_prefers_paragraph_breaks():
+    text = "A short first paragraph.\n\nThe second paragraph is long enough to need its own chunk."
+
+    chunks = _split_text(text, chunk_size=40, chunk_overlap=0)
+
+    assert chunks[0] == "A short first paragraph."
+
+
+def test_split_text_hard_cuts_words_longer_than_chunk_size():
+    text = "a" * 120 + " tail"
+
+    chunks = _split_text(text, chunk_size=50, chunk_overlap=10)
+
+    assert [len(chunk) for chunk in chunks] == [50, 50, 45]
+    assert chunks[-1].endswith(" tail")
+    # the hard cuts still overlap, there is no word boundary to move the start to
+    assert chunks[1] == text[40:90]
+
+
+def test_chunk_documents_keeps_metadata_and_numbers_chunks():
+    docs = [Document(page_content=TEXT, metadata={"page": 3})]
+
+    chunks = chunk_documents(docs, chunk_size=200, chunk_overlap=20)
+
+    assert len(chunks) > 1
+    assert [chunk.metadata for chunk in chunks] == [{"page": 3, "chunk": index} for index in range(len(chunks))]
+
+
+def test_chunk_documents_with_zero_chunk_size_keeps_documents_whole():
+    docs = [Document(page_content=TEXT, metadata={"page": 1})]
+
+    chunks = chunk_documents(docs, chunk_size=0, chunk_overlap=20)
+
+    assert [chunk.page_content for chunk in chunks] == [TEXT]
+
+
+def test_chunk_documents_caps_overlap_at_half_the_chunk_size():
+    docs = [Document(page_content=TEXT, metadata={})]
+
+    chunks = chunk_documents(docs, chunk_size=50, chunk_overlap=500)
+
+    assert chunks == chunk_documents(docs, chunk_size=50, chunk_overlap=25)
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from src.database import Database
+from src.modules.services.manifest_service import FILE_KEY, get_vanished_keys, is_changed
+from src.modules.services.tabular_data_service import TabularDataService
+
+
+BATCH_SIZE = 4
+
+
+@pytest.fixture
+def records() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "merchant": [f"merchant-{index}" for index in range(10)],
+            "amount": [float(index) for index in range(10)],
+            "is_fraud": [index % 3 == 0 for index in range(10)],
+        }
+    )
+
+
+def batch_hashes(records: pd.DataFrame) -> dict[str, str]:
+    """Hash the records the way the ingestion does, in positional batches."""
+    service = TabularDataService(Database())
+    return {
+        f"batch-{index}": service._hash_chunk(records.iloc[start:start + BATCH_SIZE])
+        for index, start in enumerate(range(0, len(records), BATCH_SIZE))
+    }
+
+
+def diff(manifest: dict[str, str], hashes: dict[str, str]) -> tuple[list[str], list[str]]:
+    changed = [key for key, content_hash in hashes.items() if is_changed(manifest, key, content_hash)]
+    return changed, get_vanished_keys(manifest, hashes)
+
+
+def test_unchanged_records_change_nothing(records):
+    manifest = batch_hashes(records) | {FILE_KEY: "file"}
+
+    assert diff(manifest, batch_hashes(records.copy())) == ([], [])
+
+
+def test_edited_row_changes_only_its_batch(records):
+    manifest = batch_hashes(records)
+    records.loc[5, "amount"] = 99.0
+
+    assert diff(manifest, batch_hashes(records)) == (["batch-1"], [])
+
+
+def test_appended_rows_change_only_the_last_batches(records):
+    manifest = batch_hashes(records)
+    appended = pd.concat([records, records.head(3)], ignore_index=True)
+
+    assert diff(manifest, batch_hashes(appended)) == (["batch-2", "batch-3"], [])
+
+
+def test_inserted_row_shifts_every_later_batch(records):
+    manifest = batch_hashes(records)
+    inserted = pd.concat([records.head(1), records], ignore_index=True)
+
+    assert diff(manifest, batch_hashes(inserted)) == (["batch-0", "batch-1", "batch-2"], [])
+
+
+def test_removed_rows_delete_vanished_batches(records):
+    manifest = batch_hashes(records) | {FILE_KEY: "file"}
+
+    changed, vanished = diff(manifest, batch_hashes(records.head(BATCH_SIZE)))
+
+    assert changed == []
+    assert vanished == ["batch-1", "batch-2"]
+
+
+def test_new_keys_count_as_changed():
+    assert is_changed({}, "batch-0", "hash")
+    assert not is_changed({"batch-0": "hash"}, "batch-0", "hash")
+
+
+def test_file_key_never_vanishes():
+    assert get_vanished_keys({FILE_KEY: "file", "page-1-chunk-0": "hash"}, {}) == ["page-1-chunk-0"]
@@ -0,0 +1,46 @@
+import pytest
+
+from src.modules.services.query_governor_service import QueryGovernorService, QueryRejectedError
+
+
+@pytest.mark.parametrize(
+    "sql_query",
+    [
+        "SELECT * FROM fraud_records WHERE description = 'a;b'",
+        "SELECT * FROM fraud_records WHERE merchant = 'O''Brien; Sons'",
+        'SELECT "odd;column" FROM fraud_records',
+        "SELECT $$a;b$$ AS value",
+        "SELECT $tag$a;b$tag$ AS value",
+        "SELECT 1 -- one; two\nFROM fraud_records",
+        "SELECT 1 /* one; two */ FROM fraud_records",
+    ],
+)
+def test_validate_allows_semicolons_in_literals_and_comments(sql_query):
+    assert QueryGovernorService().validate(sql_query) == sql_query
+
+
+def test_validate_strips_trailing_semicolons():
+    assert QueryGovernorService().validate("  SELECT 1;;  ") == "SELECT 1"
+
+
+@pytest.mark.parametrize(
+    "sql_query",
+    [
+        "SELECT 1; DELETE FROM fraud_records",
+        "SELECT 'a'; DELETE FROM fraud_records",
+        "SELECT '--'; DELETE FROM fraud_records",
+        "SELECT 'unterminated; DELETE FROM fraud_records",
+    ],
+)
+def test_validate_rejects_multiple_statements(sql_query):
+    with pytest.raises(QueryRejectedError) as error:
+        QueryGovernorService().validate(sql_query)
+
+    assert error.value.reason == "multiple_statements"
+
+
+def test_validate_rejects_non_read_queries():
+    with pytest.raises(QueryRejectedError) as error:
+        QueryGovernorService().validate("DELETE FROM fraud_records")
+
+    assert error.value.reason == "not_select"
@@ -0,0 +1,82 @@
+import pytest
+
+from src.core.config import app_config
+from src.modules.services.fraud_records_service import ResultRows
+from src.modules.utils.supervisor_util import format_sql_results, format_sql_row
+
+
+@pytest.fixture
+def result_caps(monkeypatch):
+    def set_caps(max_rows: int, max_bytes: int) -> None:
+        monkeypatch.setattr(app_config, "sql_result_max_rows", max_rows)
+        monkeypatch.setattr(app_config, "sql_result_max_bytes", max_bytes)
+
+    return set_caps
+
+
+def test_format_sql_row_renders_null_as_empty_cell():
+    assert format_sql_row(("grocery", None, 3)) == "grocery |  | 3"
+
+
+def test_format_sql_results_without_rows():
+    assert format_sql_results(["merchant_category"], [], truncated=False) == "No rows returned."
+
+
+def test_format_sql_results_renders_header_and_rows():
+    result = format_sql_results(["merchant_category", "count"], ["grocery | 3", "travel | 1"], truncated=False)
+
+    assert result == "merchant_category | count\ngrocery | 3\ntravel | 1"
+
+
+def test_format_sql_results_notes_truncation():
+    result = format_sql_results(["merchant_category"], ["grocery"], truncated=True)
+
+    assert result.startswith("merchant_category\ngrocery\n")
+    assert "truncated after 1 rows" in result
+
+
+def test_format_sql_results_truncated_before_first_row_is_not_empty():
+    result = format_sql_results(["description"], [], truncated=True)
+
+    assert result != "No rows returned."
+    assert result.startswith("description\n")
+    assert "truncated before the first row" in result
+
+
+def test_result_rows_keeps_rows_within_caps(result_caps):
+    result_caps(max_rows=10, max_bytes=1000)
+    result = ResultRows()
+
+    assert result.add([("grocery", 3), ("travel", 1)]) is True
+    assert result.rows == ["grocery | 3", "travel | 1"]
+    assert result.truncated is False
+
+
+def test_result_rows_stops_at_row_cap(result_caps):
+    result_caps(max_rows=2, max_bytes=1000)
+    result = ResultRows()
+
+    assert result.add([("a",), ("b",), ("c",)]) is False
+    assert result.rows == ["a", "b"]
+    assert result.truncated is True
+
+
+def test_result_rows_stops_at_byte_cap_across_batches(result_caps):
+    # every row takes 4 bytes with its newline
+    result_caps(max_rows=100, max_bytes=10)
+    result = ResultRows()
+
+    assert result.add([("aaa",), ("bbb",)]) is True
+    assert result.add([("ccc",)]) is False
+    assert result.rows == ["aaa", "bbb"]
+    assert result.truncated is True
+
+
+def test_result_rows_first_row_over_byte_cap(result_caps):
+    result_caps(max_rows=100, max_bytes=10)
+    result = ResultRows()
+
+    assert result.add([("x" * 50,)]) is False
+    assert result.rows == []
+    assert result.truncated is True
+    assert format_sql_results(["description"], result.rows, result.truncated) != "No rows returned."
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+
+from langchain_postgres import PGVectorStore
+
+from src.core.config import app_config
+from src.core.embedding import get_embeddings
+from src.database import Database
+from src.modules.services.vector_index_service import VectorIndexService
+
+
+db = Database()
+vector_index_service = VectorIndexService(db)
+
+async def manage_index(rebuild: bool):
+    try:
+        await db.pg_pool_open()
+        store = await PGVectorStore.create(
+            embedding_service=get_embeddings(),
+            engine=db.get_pgvector_engine(),
+            table_name=app_config.pdf_vector_table_name,
+        )
+        if rebuild:
+            await vector_index_service.arebuild(store)
+        else:
+            await vector_index_service.aensure_index(store, reindex=True)
+    finally:
+        await db.pg_pool_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or reindex the ANN index of the PDF vector table.")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and build it from scratch")
+    args = parser.parse_args()
+
+    asyncio.run(manage_index(args.rebuild))